@@ -4,6 +4,7 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from sqlalchemy import event
 from config import Config
 import os
 
@@ -16,9 +17,28 @@ def create_app(config_class=Config):
     """Create Flask application."""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    
+    if app.config.get('SENTRY_DSN'):
+        _init_sentry(app)
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        if app.config.get('DB_POOL_MODE') == 'transaction_proxy' and app.config.get('DB_STATEMENT_TIMEOUT_MS'):
+            _set_local_statement_timeout(db.engine, app.config['DB_STATEMENT_TIMEOUT_MS'])
+        
+        from app.instrumentation import query_instrumentation
+        query_instrumentation.init_app(app, db.engine)
+        
+        from app.metrics import metrics
+        metrics.init_app(app, db.engine)
+    
+    from app.compression import compression
+    compression.init_app(app)
+    from app.assets import assets
+    assets.init_app(app)
+    from app.rate_limit import limiter
+    limiter.init_app(app)
     
     migrations_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
     migrate.init_app(app, db, directory=migrations_dir)
@@ -34,12 +54,48 @@ def create_app(config_class=Config):
     from app.routes.auth import auth_bp
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')
+    
+    # Register command line tasks
+    from app.commands import build_assets_command, check_schema_command, migrate_db_command
+    app.cli.add_command(migrate_db_command)
+    app.cli.add_command(check_schema_command)
+    app.cli.add_command(build_assets_command)
 
     # Load user loader function
-    from app.models import User
+    from app.services.user_cache import user_cache
+    user_cache.init_app(app)
+    from app.services.dashboard_cache import dashboard_cache
+    dashboard_cache.init_app(app)
+    from app.services.password_hasher import password_hasher
+    password_hasher.init_app(app)
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return user_cache.load_user(int(user_id))
+
+    return app
 
-    return app 
\ No newline at end of file
+def _set_local_statement_timeout(engine, timeout_ms):
+    """Apply the statement timeout to every transaction of engine.
+
+    Behind a transaction-pooling proxy a session-level SET would leak to
+    whichever client gets the server connection next, so the timeout is set
+    with SET LOCAL at the start of each transaction instead.
+    """
+    @event.listens_for(engine, 'begin')
+    def set_statement_timeout(conn):
+        cursor = conn.connection.dbapi_connection.cursor()
+        cursor.execute(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+        cursor.close()
+
+def _init_sentry(app):
+    """Report unhandled errors and a sample of request traces to Sentry."""
+    import sentry_sdk
+    from sentry_sdk.integrations.flask import FlaskIntegration
+    
+    sentry_sdk.init(
+        dsn=app.config['SENTRY_DSN'],
+        environment=app.config.get('SENTRY_ENVIRONMENT'),
+        traces_sample_rate=app.config.get('SENTRY_TRACES_SAMPLE_RATE', 0.0),
+        integrations=[FlaskIntegration()]
+    )
@@ -0,0 +1,172 @@
+"""Fingerprinted, precompressed static assets."""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from typing import Dict
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; .gz variants are always written
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+PRECOMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.ttf', '.json', '.txt', '.html')
+CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    """Return path with a hash of content before its extension (css/style.1a2b3c4d5e6f.css)."""
+    root, ext = posixpath.splitext(path)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+
+def build_assets(static_dir: str, output_dir: str) -> Dict[str, str]:
+    """
+    Copy every file of static_dir to output_dir under a content-hashed name.
+
+    url() references in stylesheets are rewritten to the hashed names of the
+    files they point to, so stylesheets are hashed after everything else. Text
+    files also get .gz (and, with the brotli package, .br) variants when they
+    are smaller than the original.
+
+    Args:
+        static_dir: The application's static folder
+        output_dir: Where to write the hashed files and the manifest; any
+            previous build there is removed
+
+    Returns:
+        Dict[str, str]: The manifest, mapping each path relative to
+        static_dir to its hashed path relative to output_dir
+    """
+    output_dir = os.path.abspath(output_dir)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_dir)
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+            sources.append(path)
+
+    manifest = {}
+    for path in sorted(sources, key=lambda path: path.endswith('.css')):
+        with open(os.path.join(static_dir, path), 'rb') as f:
+            content = f.read()
+        if path.endswith('.css'):
+            content = _rewrite_css_urls(path, content, manifest)
+        hashed = fingerprinted_name(path, content)
+        _write(os.path.join(output_dir, hashed), content)
+        manifest[path] = hashed
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _rewrite_css_urls(path: str, content: bytes, manifest: Dict[str, str]) -> bytes:
+    """Point the relative url() references of a stylesheet to hashed files."""
+    directory = posixpath.dirname(path)
+
+    def replace(match):
+        url = match.group(2)
+        target, sep, suffix = _split_url(url)
+        if not target or target.startswith(('/', 'data:', 'http:', 'https:')):
+            return match.group(0)
+        logical = posixpath.normpath(posixpath.join(directory, target))
+        if logical not in manifest:
+            return match.group(0)
+        # The hashed stylesheet is written next to where the original was
+        hashed = posixpath.relpath(manifest[logical], directory or '.')
+        return f'url({match.group(1)}{hashed}{sep}{suffix}{match.group(1)})'
+
+    return CSS_URL.sub(replace, content.decode('utf-8')).encode('utf-8')
+
+
+def _split_url(url: str):
+    """Split a URL into its path, the ?/# separator and the rest."""
+    match = re.search(r'[?#]', url)
+    if match is None:
+        return url, '', ''
+    return url[:match.start()], match.group(0), url[match.end():]
+
+
+def _write(path: str, content: bytes) -> None:
+    """Write a hashed file and its precompressed variants."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if not path.endswith(PRECOMPRESSED_EXTENSIONS):
+        return
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+
+
+class Assets:
+    """
+    Serve the assets written by `flask build-assets`.
+
+    When the build manifest exists, url_for('static', filename=...) resolves
+    to the hashed copy, which is sent with a year-long immutable
+    Cache-Control and, when the client accepts it, as its .br or .gz
+    variant. Without a build (development, tests) static files are served as
+    usual.
+    """
+
+    def init_app(self, app):
+        """Load the manifest and take over the static view of app."""
+        app.config.setdefault('ASSETS_BUILD_DIR', 'dist')
+        app.config.setdefault('ASSETS_MAX_AGE', 365 * 24 * 60 * 60)
+        build_dir = app.config['ASSETS_BUILD_DIR']
+        manifest_path = os.path.join(app.static_folder, build_dir, MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = {path: f'{build_dir}/{hashed}' for path, hashed in json.load(f).items()}
+        app.extensions['assets'] = {'manifest': manifest, 'hashed': set(manifest.values())}
+
+        @app.url_defaults
+        def hashed_static_url(endpoint, values):
+            if endpoint == 'static' and values.get('filename') in manifest:
+                values['filename'] = manifest[values['filename']]
+
+        app.view_functions['static'] = self.send_static
+
+    @staticmethod
+    def send_static(filename):
+        """Send a static file, hashed copies with immutable caching and precompressed."""
+        if filename not in current_app.extensions['assets']['hashed']:
+            return current_app.send_static_file(filename)
+
+        static_folder = current_app.static_folder
+        accept = request.accept_encodings
+        path, encoding = filename, None
+        for suffix, name in (('.br', 'br'), ('.gz', 'gzip')):
+            if accept.quality(name) > 0 and os.path.exists(os.path.join(static_folder, filename + suffix)):
+                path, encoding = filename + suffix, name
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(static_folder, path, mimetype=mimetype,
+                                       max_age=current_app.config['ASSETS_MAX_AGE'])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if filename.endswith(PRECOMPRESSED_EXTENSIONS):
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
@@ -0,0 +1,116 @@
+"""Cache backends shared by the application caches."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class MemoryCache:
+    """Per-process LRU cache with a time-to-live for every entry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        """Initialize an empty cache holding at most maxsize entries."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store value under key unless it holds a live entry; return whether it was stored."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= now:
+                return False
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by every worker process, stored in Redis as JSON."""
+
+    def __init__(self, url: str, prefix: str = '', ttl: float = 60):
+        """Connect to the Redis server at url."""
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for the redis cache backend")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under key, or None if missing or expired."""
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds."""
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store value under key unless it exists; return whether it was stored."""
+        ttl = self.ttl if ttl is None else ttl
+        return bool(self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000), nx=True))
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache."""
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        """Remove every entry under this cache's prefix."""
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(app, prefix: str, maxsize: int, ttl: float):
+    """
+    Create a cache backend according to the application configuration.
+
+    CACHE_BACKEND selects 'memory' (default, per process) or 'redis' (shared,
+    using CACHE_REDIS_URL).
+    """
+    backend = app.config.get('CACHE_BACKEND', 'memory')
+    if backend == 'memory':
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    if backend == 'redis':
+        return RedisCache(app.config['CACHE_REDIS_URL'], prefix=prefix, ttl=ttl)
+    raise ValueError(f"Invalid cache backend: {backend}")
@@ -0,0 +1,35 @@
+"""Command line tasks (flask <command>)."""
+import os
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.assets import build_assets
+from app.schema import SchemaOutOfDate, check_schema, migrate_database
+
+
+@click.command('migrate-db')
+@with_appcontext
+def migrate_db_command():
+    """Apply the committed migrations; run once per deploy, not per replica."""
+    migrate_database()
+    click.echo('Database schema is up to date.')
+
+
+@click.command('check-schema')
+@with_appcontext
+def check_schema_command():
+    """Exit with an error if the database schema is not at the head revision."""
+    try:
+        check_schema()
+    except SchemaOutOfDate as e:
+        raise click.ClickException(str(e))
+    click.echo('Database schema is up to date.')
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Write fingerprinted, precompressed copies of the static files; run at image build."""
+    output_dir = os.path.join(current_app.static_folder, current_app.config['ASSETS_BUILD_DIR'])
+    manifest = build_assets(current_app.static_folder, output_dir)
+    click.echo(f'{len(manifest)} assets written to {output_dir}.')
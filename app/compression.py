@@ -0,0 +1,167 @@
+"""Response compression negotiated by Accept-Encoding."""
+import zlib
+from typing import Iterable, Iterator
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml'
+)
+
+
+class GzipEncoder:
+    """Incremental gzip encoder."""
+
+    name = 'gzip'
+
+    def __init__(self, level: int):
+        """Start a gzip stream (wbits=31 writes the gzip header and trailer)."""
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data, keeping what does not fill a block for later."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Return everything compressed so far, so the client can decode it."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """Incremental brotli encoder."""
+
+    name = 'br'
+
+    def __init__(self, level: int):
+        """Start a brotli stream for text."""
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data, keeping what does not fill a block for later."""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Return everything compressed so far, so the client can decode it."""
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        return self._compressor.finish()
+
+
+class Compression:
+    """
+    Compress HTML, JSON and other text responses with brotli or gzip.
+
+    The encoding is negotiated per request from Accept-Encoding; brotli is
+    only offered when the brotli package is installed. Bodies are
+    compressed chunk by chunk, never joined into one buffer: a rendered body
+    is replaced by its compressed chunks, while streamed bodies and files
+    (direct passthrough) are compressed as they are sent, each streamed
+    chunk flushed so the client can render it. Bodies known to be shorter
+    than COMPRESS_MIN_SIZE bytes are sent as they are, as are responses that
+    already have a Content-Encoding (precompressed assets) or ask for
+    no-transform.
+    """
+
+    def init_app(self, app):
+        """Register the compression hook on app."""
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_LEVEL', 4)
+        app.config.setdefault('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES)
+        if not app.config['COMPRESS_ENABLED']:
+            return
+
+        @app.after_request
+        def compress_response(response):
+            return self.compress(response, app.config)
+
+    def compress(self, response, config):
+        """Compress response in place when the client and the content allow it."""
+        if response.mimetype not in config['COMPRESS_MIMETYPES']:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (request.method == 'HEAD'
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.cache_control.no_transform):
+            return response
+
+        streamed = response.is_streamed or response.direct_passthrough
+        # Only the length of a buffered body is computed; a streamed one is
+        # compressed unless its Content-Length says it is short
+        length = response.content_length if streamed else response.calculate_content_length()
+        if length is not None and length < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoder = self.negotiate(config)
+        if encoder is None:
+            return response
+
+        if streamed:
+            response.response = _stream(response.response, encoder, flush=response.is_streamed)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+        else:
+            chunks = [encoder.compress(chunk) for chunk in response.iter_encoded()]
+            chunks.append(encoder.finish())
+            response.response = chunks
+            response.headers['Content-Length'] = str(sum(len(chunk) for chunk in chunks))
+
+        response.headers['Content-Encoding'] = encoder.name
+        # Byte ranges of the original body do not apply to the compressed one
+        response.headers.pop('Accept-Ranges', None)
+        # The compressed body is a different representation of the resource
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def negotiate(config):
+        """Return an encoder for the best encoding the client accepts, or None."""
+        accept = request.accept_encodings
+        candidates = [('gzip', accept.quality('gzip'))]
+        if brotli is not None:
+            # Listed first, so brotli wins when the client ranks both equally
+            candidates.insert(0, ('br', accept.quality('br')))
+        name, quality = max(candidates, key=lambda candidate: candidate[1])
+        if quality <= 0:
+            return None
+        if name == 'br':
+            return BrotliEncoder(config['COMPRESS_BROTLI_LEVEL'])
+        return GzipEncoder(config['COMPRESS_LEVEL'])
+
+
+def _stream(chunks: Iterable, encoder, flush: bool) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, closing the original iterable."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = encoder.compress(chunk)
+            if flush:
+                data += encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+compression = Compression()
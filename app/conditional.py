@@ -0,0 +1,59 @@
+"""Conditional GET support (ETag / Last-Modified) for JSON resources."""
+import hashlib
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+# Change when the JSON representation of the resources changes, so that
+# clients do not keep a body built by an older release
+REPRESENTATION_VERSION = 1
+
+
+def resource_etag(kind: str, resource_id: int, updated_at: Optional[datetime]) -> str:
+    """Return the ETag of a resource version, derived from (id, updated_at)."""
+    updated = _as_utc(updated_at).isoformat() if updated_at else ''
+    key = f'{REPRESENTATION_VERSION}:{kind}:{resource_id}:{updated}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def check_not_modified(kind: str, resource_id: int,
+                       load_updated_at: Callable[[], Optional[datetime]]) -> Optional[Response]:
+    """
+    Answer a conditional request from the resource's timestamp alone.
+
+    Args:
+        kind: The resource type, part of the ETag
+        resource_id: The ID of the resource
+        load_updated_at: Function returning the resource's updated_at; only
+            called when the request carries If-None-Match or If-Modified-Since
+
+    Returns:
+        Optional[Response]: A 304 response if the client's copy is current,
+        else None and the caller builds the full response
+    """
+    if 'If-None-Match' not in request.headers and 'If-Modified-Since' not in request.headers:
+        return None
+    updated_at = load_updated_at()
+    last_modified = _as_utc(updated_at) if updated_at else None
+    etag = resource_etag(kind, resource_id, updated_at)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return add_validators(Response(status=304), kind, resource_id, updated_at)
+
+
+def add_validators(response: Response, kind: str, resource_id: int,
+                   updated_at: Optional[datetime]) -> Response:
+    """Set the ETag, Last-Modified and revalidation headers of a resource on response."""
+    response.set_etag(resource_etag(kind, resource_id, updated_at))
+    if updated_at:
+        response.last_modified = _as_utc(updated_at)
+    # Clients may keep the body but must revalidate it on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _as_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes (as returned by SQLite) as UTC."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
@@ -0,0 +1,32 @@
+"""Cooperative database I/O for gevent workers."""
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """Wait for a psycopg2 connection by yielding to the gevent hub."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        if state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state}")
+
+
+def patch_psycopg2():
+    """
+    Make psycopg2 green.
+
+    psycopg2 talks to the server from C, so gevent's monkey patching does not
+    reach it and a query would block every greenlet of the worker. With this
+    wait callback libpq runs in asynchronous mode and psycopg2 waits on the
+    socket through gevent instead.
+    """
+    from psycopg2 import extensions
+
+    extensions.set_wait_callback(gevent_wait_callback)
@@ -0,0 +1,179 @@
+"""Per-request SQL query counting and timing."""
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Iterable, List, Optional, Tuple
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('app.sql')
+request_logger = logging.getLogger('app.requests')
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+THIS_FILE = os.path.abspath(__file__)
+
+
+@dataclass
+class QueryStats:
+    """SQL statements sent while serving one request."""
+
+    count: int = 0
+    duration: float = 0.0
+    statements: List[Tuple[str, float, Optional[str]]] = field(default_factory=list)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Return the query statistics of the current request, if any."""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+def find_call_site() -> Optional[str]:
+    """Return 'file:line in function' of the innermost application frame."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(APP_ROOT) and filename != THIS_FILE:
+            relative = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+            return f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view issues more SQL statements than its budget allows."""
+
+
+def format_statements(statements: Iterable[Tuple[str, float, Optional[str]]]) -> str:
+    """Format recorded statements grouped by the call site that issued them."""
+    groups = OrderedDict()
+    for statement, _, call_site in statements:
+        groups.setdefault(call_site or '<unknown>', []).append(statement)
+
+    lines = []
+    for call_site, grouped in sorted(groups.items(), key=lambda item: -len(item[1])):
+        lines.append(f'{len(grouped)} x {call_site}')
+        for statement in OrderedDict.fromkeys(grouped):
+            lines.append('    ' + ' '.join(statement.split()))
+    return '\n'.join(lines)
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the maximum number of SQL statements a view may issue.
+
+    Statements issued while the view runs, including template rendering, are
+    counted. SQL_QUERY_BUDGET sets what happens when the budget is exceeded:
+    'raise' raises QueryBudgetExceeded (used by the tests), 'log' logs a
+    warning and 'off' skips the check.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            stats = current_query_stats()
+            mode = current_app.config.get('SQL_QUERY_BUDGET', 'log')
+            if stats is None or mode == 'off':
+                return view(*args, **kwargs)
+
+            start_count, start_index = stats.count, len(stats.statements)
+            response = view(*args, **kwargs)
+            used = stats.count - start_count
+            if used > max_queries:
+                message = (f'{request.endpoint} issued {used} queries, budget is {max_queries}\n'
+                           + format_statements(stats.statements[start_index:]))
+                if mode == 'raise':
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message, extra={'endpoint': request.endpoint, 'db_queries': used,
+                                               'query_budget': max_queries})
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+class QueryInstrumentation:
+    """
+    Count and time the SQL statements of every request.
+
+    The totals are sent in a Server-Timing header and logged with the request.
+    Statements slower than SQL_SLOW_QUERY_MS are logged with their SQL and
+    the application line that issued them. With SQL_RECORD_QUERIES every
+    statement and its call site is kept on the request's QueryStats; that
+    walks the stack for each statement and is meant for tests.
+    """
+
+    def init_app(self, app, engine):
+        """Register the engine and request hooks for app."""
+        app.config.setdefault('SQL_INSTRUMENTATION_ENABLED', True)
+        app.config.setdefault('SQL_SLOW_QUERY_MS', 200)
+        app.config.setdefault('SQL_RECORD_QUERIES', False)
+        if not app.config['SQL_INSTRUMENTATION_ENABLED']:
+            return
+
+        slow_query_seconds = app.config['SQL_SLOW_QUERY_MS'] / 1000
+        record_queries = app.config['SQL_RECORD_QUERIES']
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - conn.info['query_start'].pop()
+            stats = current_query_stats()
+            if stats is not None:
+                stats.count += 1
+                stats.duration += duration
+                if record_queries:
+                    stats.statements.append((statement, duration, find_call_site()))
+            if duration >= slow_query_seconds:
+                logger.warning(
+                    'Slow query (%.1f ms) at %s: %s', duration * 1000, find_call_site(), statement,
+                    extra={'db_duration_ms': round(duration * 1000, 2), 'sql': statement}
+                )
+
+        @event.listens_for(engine, 'handle_error')
+        def handle_error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get('query_start'):
+                connection.info['query_start'].pop()
+
+        @app.before_request
+        def start_query_stats():
+            g.query_stats = QueryStats()
+            g.request_start = time.perf_counter()
+
+        @app.after_request
+        def report_query_stats(response):
+            stats = current_query_stats()
+            if stats is None:
+                return response
+            total_ms = (time.perf_counter() - g.request_start) * 1000
+            db_ms = stats.duration * 1000
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+            )
+            request_logger.info(
+                '%s %s %s %d queries %.1f ms db %.1f ms total',
+                request.method, request.path, response.status_code, stats.count, db_ms, total_ms,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'endpoint': request.endpoint,
+                    'status': response.status_code,
+                    'db_queries': stats.count,
+                    'db_duration_ms': round(db_ms, 2),
+                    'duration_ms': round(total_ms, 2)
+                }
+            )
+            return response
+
+
+query_instrumentation = QueryInstrumentation()
@@ -0,0 +1,187 @@
+"""Prometheus metrics of requests, the database pool and application writes."""
+import ipaddress
+import os
+import time
+from collections import Counter as WriteCounts
+from flask import Response, abort, current_app, g, has_app_context, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+PENDING_KEY = 'metrics_pending_writes'
+WRITE_MODELS = {'tasks': 'task', 'activities': 'activity'}
+
+# In multiprocess mode the metrics below open their files as they are created,
+# so the directory must exist before then, also for commands such as
+# `flask migrate-db` that run without gunicorn
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    'app_request_duration_seconds', 'Time spent serving a request.',
+    ['method', 'endpoint', 'status']
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'app_requests_in_progress', 'Requests currently being served.',
+    ['endpoint'], multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'app_db_pool_checked_out', 'Database connections checked out of the pool.',
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'app_db_pool_overflow', 'Database connections open beyond the pool size.',
+    multiprocess_mode='livesum'
+)
+LOGINS = Counter('app_logins_total', 'Login attempts.', ['result'])
+WRITES = Counter('app_writes_total', 'Committed task and activity writes.', ['model', 'operation'])
+
+
+def multiprocess_enabled() -> bool:
+    """Return whether metrics are shared by several worker processes."""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of an exited worker process (gunicorn child_exit)."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+def record_login(success: bool) -> None:
+    """Count a login attempt."""
+    LOGINS.labels(result='success' if success else 'failure').inc()
+
+
+def record_writes(session, model: str, operation: str, count: int = 1) -> None:
+    """
+    Count writes made outside the unit of work, such as bulk statements.
+
+    The writes are reported when session commits and dropped on rollback.
+    """
+    if count > 0:
+        session.info.setdefault(PENDING_KEY, WriteCounts())[(model, operation)] += count
+
+
+class Metrics:
+    """
+    Collect request, pool and write metrics and serve them at METRICS_PATH.
+
+    With PROMETHEUS_MULTIPROC_DIR set (before the app is imported), every
+    worker process writes its samples to files in that directory and the
+    endpoint aggregates all of them, so any worker can answer a scrape. The
+    endpoint only answers clients from METRICS_ALLOWED_NETWORKS or, when
+    METRICS_TOKEN is set, requests carrying it as a bearer token.
+    """
+
+    def init_app(self, app, engine):
+        """Register the request hooks, pool events and endpoint for app."""
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_PATH', '/metrics')
+        app.config.setdefault('METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128')
+        app.config.setdefault('METRICS_TOKEN', None)
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        if isinstance(engine.pool, QueuePool):
+            self._watch_pool(engine)
+
+        @app.before_request
+        def start_request_metrics():
+            g.metrics_endpoint = request.endpoint or 'unmatched'
+            g.metrics_start = time.perf_counter()
+            REQUESTS_IN_PROGRESS.labels(endpoint=g.metrics_endpoint).inc()
+
+        @app.after_request
+        def observe_request(response):
+            if 'metrics_start' in g:
+                REQUEST_LATENCY.labels(
+                    method=request.method, endpoint=g.metrics_endpoint, status=response.status_code
+                ).observe(time.perf_counter() - g.metrics_start)
+            return response
+
+        @app.teardown_request
+        def finish_request_metrics(exc):
+            endpoint = g.pop('metrics_endpoint', None)
+            if endpoint is not None:
+                REQUESTS_IN_PROGRESS.labels(endpoint=endpoint).dec()
+
+        app.add_url_rule(app.config['METRICS_PATH'], 'metrics', self.export)
+
+    @staticmethod
+    def _watch_pool(engine):
+        """Update the pool gauges whenever a connection is checked out or in."""
+        pool = engine.pool
+
+        @event.listens_for(engine, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+        @event.listens_for(engine, 'checkin')
+        def on_checkin(dbapi_connection, connection_record):
+            # The event fires before the pool takes the connection back; an
+            # overflow connection is closed if the pool is already full
+            overflow = pool.overflow() - (1 if pool.checkedin() >= pool.size() else 0)
+            DB_POOL_CHECKED_OUT.set(pool.checkedout() - 1)
+            DB_POOL_OVERFLOW.set(max(overflow, 0))
+
+    @staticmethod
+    def export():
+        """Return every metric in the Prometheus text exposition format."""
+        if not _is_authorized():
+            abort(404)
+        if multiprocess_enabled():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def _is_authorized() -> bool:
+    """Return whether the current request may read the metrics."""
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        return request.headers.get('Authorization') == f'Bearer {token}'
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    networks = current_app.config['METRICS_ALLOWED_NETWORKS']
+    return any(address in ipaddress.ip_network(network.strip())
+               for network in networks.split(',') if network.strip())
+
+
+metrics = Metrics()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_writes(session, flush_context):
+    """Remember the tasks and activities written by this flush."""
+    for operation, objects in (('create', session.new), ('update', session.dirty),
+                               ('delete', session.deleted)):
+        for obj in objects:
+            model = WRITE_MODELS.get(getattr(obj, '__tablename__', None))
+            if model is None:
+                continue
+            if operation == 'update' and not session.is_modified(obj, include_collections=False):
+                continue
+            record_writes(session, model, operation)
+
+
+@event.listens_for(Session, 'after_commit')
+def _count_writes(session):
+    """Report the committed writes."""
+    writes = session.info.pop(PENDING_KEY, None)
+    if writes and has_app_context() and current_app.config.get('METRICS_ENABLED', True):
+        for (model, operation), count in writes.items():
+            WRITES.labels(model=model, operation=operation).inc(count)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_writes(session):
+    """Forget the writes of a rolled back transaction."""
+    session.info.pop(PENDING_KEY, None)
@@ -16,6 +16,9 @@ class Activity(db.Model):
     """Activity model class."""
     
     __tablename__ = 'activities'
+    __table_args__ = (
+        db.Index('ix_activities_diary_id_planned_date', 'diary_id', 'planned_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -21,6 +21,16 @@ class Task(db.Model):
     """Task model class."""
     
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Listing a user's tasks, optionally filtered by status, by due date
+        db.Index('ix_tasks_user_id_status_due_date', 'user_id', 'status', 'due_date'),
+        # Keyset pagination over all of a user's tasks
+        db.Index('ix_tasks_user_id_due_date_id', 'user_id', 'due_date', 'id'),
+        # Pending tasks (dashboard), which are a small share of all tasks
+        db.Index('ix_tasks_user_id_due_date_pending', 'user_id', 'due_date',
+                 postgresql_where=db.text("status = 'pending'"),
+                 sqlite_where=db.text("status = 'pending'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -16,6 +16,11 @@ class TravelDiary(db.Model):
     """Travel Diary model class."""
     
     __tablename__ = 'travel_diaries'
+    __table_args__ = (
+        db.Index('ix_travel_diaries_user_id_start_date', 'user_id', 'start_date'),
+        # Trips that have not ended yet (dashboard)
+        db.Index('ix_travel_diaries_user_id_end_date', 'user_id', 'end_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -67,10 +72,23 @@ class TravelDiary(db.Model):
         """Return string representation of travel diary."""
         return f'<TravelDiary: {self.title}>'
 
+    @property
+    def activity_count(self):
+        """Return the number of activities, using a preloaded count if available."""
+        count = getattr(self, '_activity_count', None)
+        if count is None:
+            return len(self.activities)
+        return count
+
+    def set_activity_count(self, count):
+        """Store a precomputed activity count to avoid loading the activities."""
+        self._activity_count = count
+
     def add_activity(self, activity):
         """Add an activity to the travel diary."""
         if activity not in self.activities:
             self.activities.append(activity)
+            self._activity_count = None
 
     def to_dict(self):
         """Convert travel diary to dictionary."""
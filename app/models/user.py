@@ -1,14 +1,19 @@
 """User model."""
 from datetime import datetime, timezone
 import re
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
+from app.services.password_hasher import password_hasher
 from app import db
 
 def get_utc_now():
     """Get current UTC datetime."""
     return datetime.now(timezone.utc)
 
+def normalize_email(email):
+    """Return email as stored and looked up: trimmed and lowercase."""
+    return email.strip().lower()
+
 class User(UserMixin, db.Model):
     """User model."""
     
@@ -16,7 +21,8 @@ class User(UserMixin, db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    # Unique case-insensitively, through ix_users_email_lower below
+    email = db.Column(db.String(120), nullable=False)
     password_hash = db.Column(db.String(256))
     created_at = db.Column(db.DateTime(timezone=True), default=get_utc_now)
     updated_at = db.Column(db.DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now)
@@ -50,22 +56,28 @@ class User(UserMixin, db.Model):
     @password.setter
     def password(self, password):
         """Set password to a hashed password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """Check if password matches."""
         if not self.password_hash:
             return False
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
     @staticmethod
     def _validate_email(email):
         """Validate email format."""
+        email = normalize_email(email)
         email_regex = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
         if not email_regex.match(email):
             raise ValueError('Invalid email format')
         return email
 
+    @validates('email')
+    def _normalize_email(self, key, email):
+        """Store every email normalized, however it is assigned."""
+        return normalize_email(email) if email is not None else email
+
     def to_dict(self):
         """Convert user to dictionary."""
         return {
@@ -95,4 +107,9 @@ class User(UserMixin, db.Model):
     @property
     def is_anonymous(self):
         """Return False as anonymous users are not supported."""
-        return False 
\ No newline at end of file
+        return False 
+
+
+# Lookups go through lower(email) (see UserService.get_user_by_email), so the
+# uniqueness check and the index are on the same expression
+db.Index('ix_users_email_lower', db.func.lower(User.email), unique=True)
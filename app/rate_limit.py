@@ -0,0 +1,173 @@
+"""Token-bucket rate limiting of expensive routes."""
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from math import ceil
+from typing import Dict, Optional, Tuple
+from flask import current_app, request
+from werkzeug.exceptions import TooManyRequests
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+LIMIT_FORMAT = re.compile(r'^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$')
+
+# Atomically refill the bucket in KEYS[1] and take one token.
+# ARGV: capacity, tokens per second, now; returns the seconds to wait (0 if allowed)
+CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+def parse_limit(limit: str) -> Tuple[int, float]:
+    """Parse 'N/period' into the bucket capacity and its refill rate in tokens per second."""
+    match = LIMIT_FORMAT.match(limit)
+    if not match:
+        raise ValueError(f"Invalid rate limit {limit!r}; expected e.g. '5/minute'")
+    count = int(match.group(1))
+    return count, count / PERIODS[match.group(2)]
+
+
+class MemoryBucketStore:
+    """Token buckets of this process only, dropping the least recently used beyond maxsize."""
+
+    def __init__(self, maxsize: int = 10000):
+        """Create an empty store."""
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, rate: float, now: Optional[float] = None) -> float:
+        """Take a token from the bucket under key; return the seconds to wait, 0 if allowed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker process, stored in Redis."""
+
+    def __init__(self, url: str, prefix: str = 'ratelimit:'):
+        """Connect to the Redis server at url."""
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for the redis rate limit backend")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._consume = self.client.register_script(CONSUME_SCRIPT)
+
+    def consume(self, key: str, capacity: int, rate: float, now: Optional[float] = None) -> float:
+        """Take a token from the bucket under key; return the seconds to wait, 0 if allowed."""
+        now = time.time() if now is None else now
+        return float(self._consume(keys=[self.prefix + key], args=[capacity, rate, now]))
+
+
+def create_bucket_store(app):
+    """
+    Create the bucket store according to the application configuration.
+
+    RATELIMIT_BACKEND selects 'memory' (per process, so each worker allows
+    the full limit) or 'redis' (shared, using RATELIMIT_REDIS_URL).
+    """
+    backend = app.config['RATELIMIT_BACKEND']
+    if backend == 'memory':
+        return MemoryBucketStore(maxsize=app.config['RATELIMIT_SIZE'])
+    if backend == 'redis':
+        return RedisBucketStore(app.config['RATELIMIT_REDIS_URL'])
+    raise ValueError(f"Invalid rate limit backend: {backend}")
+
+
+class RateLimiter:
+    """
+    Reject requests over their route's limits with 429 Too Many Requests.
+
+    RATELIMIT_LIMITS maps an endpoint to limits per key, e.g.
+    {'auth.login': {'ip': '20/minute', 'email': '5/minute'}}. The 'ip' key
+    is the client address (behind a proxy, apply werkzeug's ProxyFix so it
+    is not the proxy's) and the 'email' key the submitted email, so one
+    address cannot try many accounts and many addresses cannot hammer one
+    account. Each key has a token bucket holding up to N attempts and
+    refilled at N per period. The check runs before the view, so rejected
+    requests cost no database query and no password hashing.
+    """
+
+    def init_app(self, app):
+        """Create the bucket store of app."""
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_BACKEND', 'memory')
+        app.config.setdefault('RATELIMIT_REDIS_URL', app.config.get('CACHE_REDIS_URL'))
+        app.config.setdefault('RATELIMIT_SIZE', 10000)
+        app.config.setdefault('RATELIMIT_LIMITS', {})
+        for limits in app.config['RATELIMIT_LIMITS'].values():
+            for limit in limits.values():
+                parse_limit(limit)
+        app.extensions['rate_limiter'] = create_bucket_store(app)
+
+    def limit(self, methods=('POST',)):
+        """Apply the configured limits of the decorated view to requests with these methods."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method in methods and current_app.config['RATELIMIT_ENABLED']:
+                    self.check(request.endpoint)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def check(self, endpoint: str) -> None:
+        """
+        Take a token from every bucket of the current request.
+
+        Raises:
+            TooManyRequests: If any bucket is empty, with Retry-After set
+        """
+        store = current_app.extensions['rate_limiter']
+        wait = 0.0
+        for kind, value in self._keys(current_app.config['RATELIMIT_LIMITS'].get(endpoint, {})):
+            capacity, rate = parse_limit(current_app.config['RATELIMIT_LIMITS'][endpoint][kind])
+            wait = max(wait, store.consume(f'{endpoint}:{kind}:{value}', capacity, rate))
+        if wait:
+            current_app.logger.warning(f"Rate limit exceeded on {endpoint} from {request.remote_addr}")
+            raise TooManyRequests(
+                description='Demasiados intentos. Intenta nuevamente más tarde.',
+                retry_after=ceil(wait)
+            )
+
+    @staticmethod
+    def _keys(limits: Dict[str, str]):
+        """Yield the (kind, value) pairs identifying the current request."""
+        if 'ip' in limits:
+            yield 'ip', request.remote_addr or 'unknown'
+        if 'email' in limits:
+            email = (request.form.get('email') or '').strip().lower()
+            if email:
+                yield 'email', email
+
+
+limiter = RateLimiter()
@@ -2,12 +2,16 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 
+from app.metrics import record_login
+from app.rate_limit import limiter
+from app.services.password_hasher import PasswordHashingBusy
 from app.services.user_service import UserService
 
 auth_bp = Blueprint('auth', __name__)
 user_service = UserService()
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit()
 def login():
     """Login route."""
     if current_user.is_authenticated:
@@ -40,13 +44,14 @@ def login():
                 flash('Tu cuenta está inactiva. Contacta al administrador.', 'danger')
                 return redirect(url_for('auth.login'))
             
-            if user.check_password(password):
+            if user_service.verify_password(user, password):
                 current_app.logger.info(f"Password check passed for user: {email}")
                 
                 # Intentar login y capturar el resultado
                 login_result = login_user(user, remember=remember)
                 current_app.logger.info(f"Login result for {email}: {login_result}")
                 
+                record_login(login_result)
                 if login_result:
                     flash('¡Bienvenido!', 'success')
                     next_page = request.args.get('next')
@@ -58,10 +63,15 @@ def login():
                     flash('No se pudo iniciar sesión. Por favor intenta nuevamente.', 'danger')
             else:
                 current_app.logger.warning(f"Invalid password for user: {email}")
+                record_login(False)
                 flash('Email o contraseña incorrectos.', 'danger')
         except ValueError as e:
             current_app.logger.error(f"ValueError during login: {str(e)}")
+            record_login(False)
             flash('Usuario no encontrado.', 'danger')
+        except PasswordHashingBusy:
+            current_app.logger.warning(f"Password hashing busy during login for email: {email}")
+            flash('Hay demasiados inicios de sesión en curso. Intenta nuevamente en unos segundos.', 'warning')
         except Exception as e:
             current_app.logger.error(f"Unexpected error during login: {str(e)}")
             flash('Ocurrió un error al intentar iniciar sesión.', 'danger')
@@ -71,6 +81,7 @@ def login():
     return render_template('auth/login.html')
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
+@limiter.limit()
 def register():
     """Register route."""
     if current_user.is_authenticated:
@@ -82,18 +93,22 @@ def register():
         password = request.form.get('password')
         
         try:
-            user = user_service.create_user(
+            user_service.create_user(
                 username=username,
                 email=email,
                 password=password
             )
-            current_app.logger.info(f"User registered successfully: {user.email}")
+            current_app.logger.info(f"User registered successfully: {email}")
             flash('¡Registro exitoso! Por favor inicia sesión.', 'success')
             return redirect(url_for('auth.login'))
         except ValueError as e:
             current_app.logger.error(f"Registration error: {str(e)}")
             flash(str(e), 'danger')
             return redirect(url_for('auth.register'))
+        except PasswordHashingBusy:
+            current_app.logger.warning(f"Password hashing busy during registration for email: {email}")
+            flash('Hay demasiados registros en curso. Intenta nuevamente en unos segundos.', 'warning')
+            return redirect(url_for('auth.register'))
     
     return render_template('auth/register.html')
 
@@ -1,38 +1,27 @@
 """Views for the main blueprint."""
 from datetime import datetime, timezone
-from flask import render_template, jsonify, request, flash, redirect, url_for
+from flask import render_template, jsonify, request, flash, redirect, url_for, make_response
 from flask_login import current_user, login_required
+from app.conditional import add_validators, check_not_modified
+from app.instrumentation import query_budget
 from app.routes import main_bp
+from app.services.dashboard_cache import dashboard_cache
 from app.services.task_service import TaskService
 from app.services.travel_service import TravelService
-from app.models.activity import Activity
 from app import db
 
-NO_AUTHORIZED = 'No autorizado'
 
 @main_bp.route('/')
+@query_budget(4)
 def index():
     """Index route."""
     pending_tasks = []
     upcoming_travels = []
     
     if current_user.is_authenticated:
-        # Get pending tasks
-        task_service = TaskService()
-        pending_tasks = task_service.get_user_tasks(
-            current_user,
-            status='pending',
-            limit=5
-        )
-        
-        # Get upcoming travels
-        travel_service = TravelService()
-        upcoming_travels = travel_service.get_user_diaries(current_user)
-        # limitar a 5
-        now = datetime.now(timezone.utc)
-        upcoming_travels = [
-            travel for travel in upcoming_travels 
-        ][:5]
+        dashboard = dashboard_cache.get_dashboard(current_user, build_dashboard)
+        pending_tasks = dashboard['pending_tasks']
+        upcoming_travels = dashboard['upcoming_travels']
     
     return render_template(
         'index.html',
@@ -40,14 +29,36 @@ def index():
         upcoming_travels=upcoming_travels
     )
 
+def build_dashboard(user):
+    """Return the pending tasks and upcoming travels shown on a user's dashboard."""
+    # Get pending tasks
+    task_service = TaskService()
+    pending_tasks = task_service.get_user_tasks(
+        user,
+        status='pending',
+        limit=5
+    )
+    
+    # Get upcoming travels
+    travel_service = TravelService()
+    upcoming_travels = travel_service.get_upcoming_diaries(
+        user,
+        now=datetime.now(timezone.utc),
+        limit=5
+    )
+    
+    return {'pending_tasks': pending_tasks, 'upcoming_travels': upcoming_travels}
+
 @main_bp.route('/profile')
 @login_required
+@query_budget(3)
 def profile():
     """User profile route."""
     return render_template('profile.html', user=current_user)
 
 @main_bp.route('/tasks')
 @login_required
+@query_budget(3)
 def tasks():
     """Tasks list route."""
     task_service = TaskService()
@@ -55,17 +66,32 @@ def tasks():
     # Get filter parameters
     category = request.args.get('category')
     status = request.args.get('status')
+    cursor = request.args.get('cursor')
     
-    # Get tasks with filters
-    tasks = task_service.get_user_tasks(
-        current_user,
-        category=category,
-        status=status
-    )
+    # Get one page of tasks with filters
+    try:
+        tasks, next_cursor = task_service.get_user_tasks_page(
+            current_user,
+            category=category,
+            status=status,
+            cursor=cursor
+        )
+    except ValueError as e:
+        if cursor:
+            return jsonify({'error': str(e)}), 400
+        raise
+    
+    # Following pages are requested by the infinite scroll as HTML fragments
+    if cursor:
+        response = make_response(render_template('tasks/_task_cards.html', tasks=tasks))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     
     return render_template(
         'tasks/index.html',
         tasks=tasks,
+        next_cursor=next_cursor,
         categories=TaskService.VALID_CATEGORIES,
         statuses=TaskService.VALID_STATUSES,
         selected_category=category,
@@ -108,25 +134,78 @@ def create_task():
     
     return redirect(url_for('main.tasks'))
 
+@main_bp.route('/tasks/bulk', methods=['POST'])
+@login_required
+def bulk_tasks():
+    """Create, update or delete many tasks in a single transaction.
+
+    Expects a JSON body with an ``action`` ('create', 'complete',
+    'update_status' or 'delete'), plus ``tasks`` (list of task payloads) for
+    'create', or ``ids`` (list of task IDs) and ``status`` for the others.
+    """
+    task_service = TaskService()
+    payload = request.get_json(silent=True) or {}
+    action = payload.get('action')
+    
+    try:
+        if action == 'create':
+            tasks_data = payload.get('tasks')
+            if not isinstance(tasks_data, list) or not all(isinstance(data, dict) for data in tasks_data):
+                raise ValueError('Se requiere una lista de tareas')
+            for data in tasks_data:
+                if data.get('due_date'):
+                    data['due_date'] = datetime.fromisoformat(data['due_date'])
+            tasks = task_service.bulk_create_tasks(current_user, tasks_data)
+            return jsonify({
+                'message': 'Tareas creadas exitosamente',
+                'ids': [task.id for task in tasks]
+            }), 201
+        
+        ids = payload.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(task_id, int) for task_id in ids):
+            raise ValueError('Se requiere una lista de IDs de tareas')
+        
+        if action == 'complete':
+            count = task_service.bulk_update_status(current_user, ids, 'completed')
+            message = 'Tareas completadas exitosamente'
+        elif action == 'update_status':
+            count = task_service.bulk_update_status(current_user, ids, payload.get('status'))
+            message = 'Tareas actualizadas exitosamente'
+        elif action == 'delete':
+            count = task_service.bulk_delete(current_user, ids)
+            message = 'Tareas eliminadas exitosamente'
+        else:
+            raise ValueError('Acción no válida')
+        
+        return jsonify({'message': message, 'count': count})
+    except (ValueError, TypeError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
 @main_bp.route('/tasks/<int:task_id>')
 @login_required
+@query_budget(3)
 def get_task(task_id):
     """Get task details route."""
     task_service = TaskService()
     
     try:
-        task = task_service.get_task_by_id(task_id)
-        if task.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        not_modified = check_not_modified(
+            'task', task_id, lambda: task_service.get_owned_task_updated_at(current_user.id, task_id)
+        )
+        if not_modified is not None:
+            return not_modified
         
-        return jsonify({
+        task = task_service.get_owned_task(current_user.id, task_id)
+        
+        return add_validators(jsonify({
             'id': task.id,
             'title': task.title,
             'description': task.description,
             'category': task.category,
             'status': task.status,
             'due_date': task.due_date.isoformat() if task.due_date else None
-        })
+        }), 'task', task.id, task.updated_at)
     except ValueError:
         return jsonify({'error': 'Tarea no encontrada'}), 404
 
@@ -138,10 +217,7 @@ def update_task(task_id):
     
     try:
         # Primero obtener la tarea existente
-        task = task_service.get_task_by_id(task_id)
-        if task.user != current_user:
-            flash(NO_AUTHORIZED, 'danger')
-            return redirect(url_for('main.tasks'))
+        task = task_service.get_owned_task(current_user.id, task_id)
         
         # Construir el diccionario de actualización solo con los campos que cambiaron
         update_data = {}
@@ -195,14 +271,13 @@ def update_task(task_id):
 
 @main_bp.route('/tasks/<int:task_id>/complete', methods=['POST'])
 @login_required
+@query_budget(3)
 def complete_task(task_id):
     """Mark task as completed route."""
     task_service = TaskService()
     
     try:
-        task = task_service.get_task_by_id(task_id)
-        if task.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        task = task_service.get_owned_task(current_user.id, task_id)
         
         task_service.mark_task_completed(task)
         return jsonify({'message': 'Tarea completada exitosamente'})
@@ -211,14 +286,13 @@ def complete_task(task_id):
 
 @main_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @login_required
+@query_budget(4)
 def delete_task(task_id):
     """Delete task route."""
     task_service = TaskService()
     
     try:
-        task = task_service.get_task_by_id(task_id)
-        if task.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        task = task_service.get_owned_task(current_user.id, task_id)
         
         task_service.delete_task(task)
         return jsonify({'message': 'Tarea eliminada exitosamente'})
@@ -227,10 +301,11 @@ def delete_task(task_id):
 
 @main_bp.route('/travel')
 @login_required
+@query_budget(3)
 def travel():
     """Travel diaries list route."""
     travel_service = TravelService()
-    travel_diaries = travel_service.get_user_diaries(current_user)
+    travel_diaries = travel_service.get_user_diaries(current_user, loading='selectin')
     
     return render_template(
         'travel/index.html',
@@ -280,43 +355,55 @@ def create_travel():
 
 @main_bp.route('/travel/<int:diary_id>')
 @login_required
+@query_budget(4)
 def travel_detail(diary_id):
     """Travel diary detail route."""
+    if wants_json():
+        return get_travel(diary_id)
+    
     travel_service = TravelService()
     
     try:
-        diary = travel_service.get_diary_by_id(diary_id)
-        if diary.user != current_user:
-            flash(NO_AUTHORIZED, 'danger')
-            return redirect(url_for('main.travel'))
+        diary = travel_service.get_owned_diary(current_user.id, diary_id)
         
         return render_template(
             'travel/detail.html',
-            diary=diary
+            diary=diary,
+            activities=travel_service.get_diary_activities(diary),
+            summary=travel_service.get_diary_summary(diary)
         )
     except ValueError:
         flash('Viaje no encontrado.', 'danger')
         return redirect(url_for('main.travel'))
 
-@main_bp.route('/travel/<int:diary_id>', methods=['GET'])
+def wants_json():
+    """Tell whether the client asked for JSON rather than a page."""
+    accept = request.accept_mimetypes
+    return accept.accept_json and not accept.accept_html
+
 @login_required
+@query_budget(3)
 def get_travel(diary_id):
-    """Get travel diary details route."""
+    """Get travel diary details route (GET /travel/<id> with Accept: application/json)."""
     travel_service = TravelService()
     
     try:
-        diary = travel_service.get_diary_by_id(diary_id)
-        if diary.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        not_modified = check_not_modified(
+            'travel', diary_id, lambda: travel_service.get_owned_diary_updated_at(current_user.id, diary_id)
+        )
+        if not_modified is not None:
+            return not_modified
+        
+        diary = travel_service.get_owned_diary(current_user.id, diary_id)
         
-        return jsonify({
+        return add_validators(jsonify({
             'id': diary.id,
             'title': diary.title,
             'location': diary.location,
             'description': diary.description,
             'start_date': diary.start_date.isoformat(),
             'end_date': diary.end_date.isoformat() if diary.end_date else None
-        })
+        }), 'travel', diary.id, diary.updated_at)
     except ValueError:
         return jsonify({'error': 'Viaje no encontrado'}), 404
 
@@ -327,10 +414,7 @@ def update_travel(diary_id):
     travel_service = TravelService()
     
     try:
-        diary = travel_service.get_diary_by_id(diary_id)
-        if diary.user != current_user:
-            flash(NO_AUTHORIZED, 'danger')
-            return redirect(url_for('main.travel'))
+        diary = travel_service.get_owned_diary(current_user.id, diary_id)
         
         # Get form data
         update_data = {
@@ -368,9 +452,7 @@ def delete_travel(diary_id):
     travel_service = TravelService()
     
     try:
-        diary = travel_service.get_diary_by_id(diary_id)
-        if diary.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        diary = travel_service.get_owned_diary(current_user.id, diary_id)
         
         travel_service.delete_diary(diary)
         return jsonify({'message': 'Viaje eliminado exitosamente'})
@@ -384,10 +466,7 @@ def create_activity(diary_id):
     travel_service = TravelService()
     
     try:
-        diary = travel_service.get_diary_by_id(diary_id)
-        if diary.user != current_user:
-            flash(NO_AUTHORIZED, 'danger')
-            return redirect(url_for('main.travel'))
+        diary = travel_service.get_owned_diary(current_user.id, diary_id)
         
         # Get form data
         title = request.form['title']
@@ -425,16 +504,22 @@ def create_activity(diary_id):
 
 @main_bp.route('/travel/activity/<int:activity_id>', methods=['GET'])
 @login_required
+@query_budget(3)
 def get_activity(activity_id):
     """Get activity details route."""
     travel_service = TravelService()
     
     try:
-        activity = travel_service.get_activity_by_id(activity_id)
-        if activity.diary.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        not_modified = check_not_modified(
+            'activity', activity_id,
+            lambda: travel_service.get_owned_activity_updated_at(current_user.id, activity_id)
+        )
+        if not_modified is not None:
+            return not_modified
+        
+        activity = travel_service.get_owned_activity(current_user.id, activity_id)
         
-        return jsonify({
+        return add_validators(jsonify({
             'id': activity.id,
             'title': activity.title,
             'location': activity.location,
@@ -442,9 +527,9 @@ def get_activity(activity_id):
             'planned_date': activity.planned_date.isoformat(),
             'cost': activity.cost,
             'notes': activity.notes,
-            'completed': activity.completed,
+            'completed': activity.is_completed,
             'completion_notes': activity.completion_notes
-        })
+        }), 'activity', activity.id, activity.updated_at)
     except ValueError:
         return jsonify({'error': 'Actividad no encontrada'}), 404
 
@@ -455,11 +540,12 @@ def update_activity(activity_id):
     travel_service = TravelService()
     
     try:
-        activity = travel_service.get_activity_by_id(activity_id)
-        if activity.diary.user != current_user:
-            flash(NO_AUTHORIZED, 'danger')
-            return redirect(url_for('main.travel'))
-        
+        activity = travel_service.get_owned_activity(current_user.id, activity_id)
+    except ValueError:
+        flash('Actividad no encontrada.', 'danger')
+        return redirect(url_for('main.travel'))
+    
+    try:
         # Get form data
         update_data = {
             'title': request.form['title'],
@@ -494,20 +580,16 @@ def complete_activity(activity_id):
     travel_service = TravelService()
     
     try:
-        activity = Activity.query.get(activity_id)
-        if not activity:
-            flash('No se encontró la actividad.', 'danger')
-            return redirect(url_for('main.travel'))
-            
-        if activity.diary.user != current_user:
-            flash('No tienes permiso para completar esta actividad.', 'danger')
-            return redirect(url_for('main.travel_detail', diary_id=activity.diary_id))
+        activity = travel_service.get_owned_activity(current_user.id, activity_id)
         
         completion_notes = request.form.get('completion_notes')
         travel_service.mark_activity_completed(activity, completion_notes)
         
         flash('Actividad completada exitosamente.', 'success')
         return redirect(url_for('main.travel_detail', diary_id=activity.diary_id))
+    except ValueError:
+        flash('No se encontró la actividad.', 'danger')
+        return redirect(url_for('main.travel'))
     except Exception as e:
         flash('Error al completar la actividad.', 'danger')
         return redirect(url_for('main.travel'))
@@ -519,16 +601,12 @@ def delete_activity(activity_id):
     travel_service = TravelService()
     
     try:
-        activity = Activity.query.get(activity_id)
-        if not activity:
-            return jsonify({'error': 'Actividad no encontrada'}), 404
-            
-        if activity.diary.user != current_user:
-            return jsonify({'error': NO_AUTHORIZED}), 403
+        activity = travel_service.get_owned_activity(current_user.id, activity_id)
         
-        db.session.delete(activity)
-        db.session.commit()
+        travel_service.delete_activity(activity)
         
         return jsonify({'message': 'Actividad eliminada exitosamente'})
+    except ValueError:
+        return jsonify({'error': 'Actividad no encontrada'}), 404
     except Exception as e:
         return jsonify({'error': 'Error al eliminar la actividad'}), 500 
\ No newline at end of file
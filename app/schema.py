@@ -0,0 +1,118 @@
+"""Database schema upgrades and the startup schema version check."""
+import logging
+import zlib
+from contextlib import contextmanager
+from typing import Set
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import current_app
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+from app import db
+
+logger = logging.getLogger('app.schema')
+
+# Revision matching the schema that container startup used to autogenerate
+BASELINE_REVISION = '706142a007dc'
+MIGRATION_LOCK_ID = zlib.crc32(b'life_organizer.migrations')
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised when the database is not at the revision the code expects."""
+
+
+def script_heads() -> Set[str]:
+    """Return the head revisions of the committed migration scripts."""
+    config = current_app.extensions['migrate'].migrate.get_config()
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def known_revisions() -> Set[str]:
+    """Return every revision of the committed migration scripts."""
+    config = current_app.extensions['migrate'].migrate.get_config()
+    return {script.revision for script in ScriptDirectory.from_config(config).walk_revisions()}
+
+
+def database_heads(connection) -> Set[str]:
+    """Return the revisions recorded in the database's alembic_version table."""
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def check_schema() -> None:
+    """
+    Make sure the database schema is at the head revision.
+
+    This is a single small query, meant to run when a web process starts;
+    migrations themselves are applied by `flask migrate-db`.
+
+    Raises:
+        SchemaOutOfDate: If the database is behind or ahead of the code
+    """
+    with db.engine.connect() as connection:
+        current = database_heads(connection)
+    expected = script_heads()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(expected))}; run 'flask migrate-db'"
+        )
+
+
+@contextmanager
+def migration_lock():
+    """
+    Hold a PostgreSQL advisory lock for the duration of the block.
+
+    Replicas started together wait for each other instead of migrating
+    concurrently; the lock is held on its own connection, which must reach
+    the server directly rather than through a transaction-pooling proxy.
+    Other databases are not locked.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+
+    with db.engine.connect() as connection:
+        connection.execute(text('SELECT pg_advisory_lock(:id)'), {'id': MIGRATION_LOCK_ID})
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': MIGRATION_LOCK_ID})
+            connection.commit()
+
+
+def adopt_legacy_database() -> None:
+    """
+    Stamp databases created by the autogenerated startup migrations.
+
+    Containers used to run `flask db migrate` when they started, recording a
+    revision that does not exist in the committed scripts. Those databases
+    hold the baseline schema, so they are marked as being at
+    BASELINE_REVISION and upgraded from there.
+
+    Raises:
+        SchemaOutOfDate: If the tables exist but no revision is recorded
+    """
+    with db.engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+        current = database_heads(connection) if 'alembic_version' in tables else set()
+
+    if current and not current <= known_revisions():
+        logger.warning('Unknown schema revision %s, stamping %s',
+                       ', '.join(sorted(current)), BASELINE_REVISION)
+        with db.engine.begin() as connection:
+            connection.execute(text('DELETE FROM alembic_version'))
+        stamp(revision=BASELINE_REVISION)
+    elif not current and 'users' in tables:
+        raise SchemaOutOfDate(
+            "Tables exist but no schema revision is recorded; "
+            "mark the matching revision with 'flask db stamp <revision>'"
+        )
+
+
+def migrate_database() -> None:
+    """Upgrade the database to the head revision, one process at a time."""
+    with migration_lock():
+        adopt_legacy_database()
+        upgrade()
@@ -0,0 +1,156 @@
+"""Cache of the per-user dashboard shown by the index view."""
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable
+from flask import current_app, has_app_context
+from app.cache import create_cache
+from app.models import User
+
+TASK_FIELDS = ('id', 'title', 'description', 'status', 'due_date')
+TRAVEL_FIELDS = ('id', 'title', 'location', 'start_date', 'activity_count')
+DATETIME_FIELDS = ('due_date', 'start_date')
+VERSION_TTL = 24 * 60 * 60
+
+
+class DashboardCache:
+    """
+    Cache of the dashboard view-model, keyed per user.
+
+    Entries are stored under a per-user version that invalidate() replaces,
+    so a dashboard built while a write was committing is not read after it
+    by any process sharing the backend. With the 'memory' backend each
+    worker process has its own versions, so a write only invalidates the
+    dashboard of the worker that served it; production therefore disables
+    the cache unless it is shared or there is a single worker (see
+    config.shared_dashboard_cache).
+
+    A miss is computed once: concurrent requests for the same user wait on a
+    lock in this process and, with a shared backend, on a lock entry that
+    other processes see, for up to DASHBOARD_CACHE_LOCK_WAIT seconds before
+    building the dashboard themselves.
+    """
+
+    def __init__(self):
+        """Initialize the per-user locks of this process."""
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Create the cache backend for app."""
+        app.config.setdefault('DASHBOARD_CACHE_ENABLED', True)
+        app.config.setdefault('DASHBOARD_CACHE_TTL', 60)
+        app.config.setdefault('DASHBOARD_CACHE_SIZE', 1024)
+        app.config.setdefault('DASHBOARD_CACHE_LOCK_WAIT', 2.0)
+        app.extensions['dashboard_cache'] = create_cache(
+            app,
+            prefix='dashboard:',
+            maxsize=app.config['DASHBOARD_CACHE_SIZE'] * 2,
+            ttl=app.config['DASHBOARD_CACHE_TTL']
+        )
+
+    @property
+    def backend(self):
+        """Return the cache backend of the current application."""
+        return current_app.extensions['dashboard_cache']
+
+    def get_dashboard(self, user: User, build: Callable[[User], dict]) -> dict:
+        """
+        Get a user's dashboard, from the cache when possible.
+
+        Args:
+            user: The user whose dashboard is shown
+            build: Function returning the dashboard of a user, called on a miss
+
+        Returns:
+            dict: 'pending_tasks' and 'upcoming_travels', as lists of dicts
+        """
+        if not current_app.config['DASHBOARD_CACHE_ENABLED']:
+            return build(user)
+
+        key = f'{user.id}:{self._version(user.id)}'
+        dashboard = self.backend.get(key)
+        if dashboard is not None:
+            return self._restore(dashboard)
+
+        with self._lock_for(key):
+            dashboard = self.backend.get(key)
+            if dashboard is None:
+                dashboard = self._build_once(key, user, build)
+        return self._restore(dashboard)
+
+    def invalidate(self, user_id: int) -> None:
+        """Discard a user's cached dashboard."""
+        if has_app_context() and 'dashboard_cache' in current_app.extensions:
+            self.backend.set(f'{user_id}:version', uuid.uuid4().hex, ttl=VERSION_TTL)
+
+    def _version(self, user_id: int) -> str:
+        """Return the current cache version of a user."""
+        version_key = f'{user_id}:version'
+        version = self.backend.get(version_key)
+        if version is None:
+            self.backend.add(version_key, uuid.uuid4().hex, ttl=VERSION_TTL)
+            version = self.backend.get(version_key)
+        return version
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        """Return the lock of a cache key in this process."""
+        with self._locks_lock:
+            if len(self._locks) > current_app.config['DASHBOARD_CACHE_SIZE']:
+                self._locks = {name: lock for name, lock in self._locks.items() if lock.locked()}
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _build_once(self, key: str, user: User, build: Callable[[User], dict]) -> dict:
+        """Build and store the dashboard unless another process is already building it."""
+        lock_key = f'{key}:lock'
+        wait = current_app.config['DASHBOARD_CACHE_LOCK_WAIT']
+        if not self.backend.add(lock_key, 1, ttl=wait):
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                dashboard = self.backend.get(key)
+                if dashboard is not None:
+                    return dashboard
+
+        try:
+            dashboard = self._dump(build(user))
+            self.backend.set(key, dashboard)
+        finally:
+            self.backend.delete(lock_key)
+        return dashboard
+
+    @staticmethod
+    def _dump(dashboard: dict) -> dict:
+        """Return the dashboard as JSON-compatible values."""
+        return {
+            'pending_tasks': [_dump_fields(task, TASK_FIELDS) for task in dashboard['pending_tasks']],
+            'upcoming_travels': [_dump_fields(travel, TRAVEL_FIELDS)
+                                 for travel in dashboard['upcoming_travels']]
+        }
+
+    @staticmethod
+    def _restore(dashboard: dict) -> dict:
+        """Turn cached dates back into datetimes."""
+        return {name: [_restore_fields(item) for item in items] for name, items in dashboard.items()}
+
+
+def _dump_fields(obj, fields) -> dict:
+    """Return the given attributes of obj, with dates as ISO strings."""
+    values = {name: getattr(obj, name) for name in fields}
+    for name in DATETIME_FIELDS:
+        if values.get(name) is not None:
+            values[name] = values[name].isoformat()
+    return values
+
+
+def _restore_fields(values: dict) -> dict:
+    """Return a copy of cached values with ISO strings turned into datetimes."""
+    values = dict(values)
+    for name in DATETIME_FIELDS:
+        if values.get(name) is not None:
+            values[name] = datetime.fromisoformat(values[name])
+    return values
+
+
+dashboard_cache = DashboardCache()
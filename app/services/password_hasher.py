@@ -0,0 +1,147 @@
+"""Password hashing off the request thread."""
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+# Lowest work factors allowed outside testing (scrypt cost, pbkdf2 iterations)
+MIN_SCRYPT_COST = 2 ** 14
+MIN_PBKDF2_ITERATIONS = 100_000
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when too many passwords are already waiting to be hashed."""
+
+
+def normalize_method(method: str) -> str:
+    """Return a werkzeug hash method with its defaults spelled out, as stored in hashes."""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ':'.join([name] + args + defaults[len(args):])
+
+
+def is_weak_method(method: str) -> bool:
+    """Return whether method is too cheap (or unknown) to protect real passwords."""
+    name, *args = normalize_method(method).split(':')
+    try:
+        if name == 'scrypt':
+            return int(args[0]) < MIN_SCRYPT_COST
+        if name == 'pbkdf2':
+            return int(args[1]) < MIN_PBKDF2_ITERATIONS
+    except (IndexError, ValueError):
+        pass
+    return True
+
+
+def gevent_threadpool():
+    """Return the native thread pool of gevent's hub if gevent has patched threading, else None."""
+    if 'gevent' not in sys.modules:
+        return None
+    from gevent import get_hub, monkey
+    if not monkey.is_module_patched('threading'):
+        return None
+    return get_hub().threadpool
+
+
+class PasswordHasher:
+    """
+    Hash and verify passwords in a pool of worker processes.
+
+    The key derivation is deliberately slow; run inline it would hold the
+    worker (and, under gevent, every other request of that worker) for its
+    whole duration. Here it runs in PASSWORD_HASH_POOL_SIZE processes per web
+    worker, while the request only waits. At most PASSWORD_HASH_MAX_PENDING
+    hashes may be running or queued; a request that cannot get a slot within
+    PASSWORD_HASH_TIMEOUT seconds fails with PasswordHashingBusy instead of
+    growing the queue. PASSWORD_HASH_METHOD sets the work factor; hashes
+    made with other parameters are upgraded on login (see needs_rehash).
+    With a pool size of 0, or outside an application, hashing runs inline.
+
+    Under a gevent worker, the pool's result handling would run on patched
+    threads, so hashing goes to the hub's native thread pool instead; hashlib
+    releases the GIL while deriving the key, and the hub keeps serving the
+    other greenlets. The slots and timeout apply the same way.
+
+    Any werkzeug method can be configured, so hashes always keep werkzeug's
+    "method$salt$hash" format and verify whatever method made them. Methods
+    below MIN_SCRYPT_COST / MIN_PBKDF2_ITERATIONS are refused unless TESTING
+    is set, which lets the tests use a cheap one.
+    """
+
+    def init_app(self, app):
+        """Set the hashing defaults and the concurrency cap of app."""
+        app.config.setdefault('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        method = app.config['PASSWORD_HASH_METHOD']
+        if is_weak_method(method) and not app.testing:
+            raise RuntimeError(f'PASSWORD_HASH_METHOD {method!r} is too weak; it is only allowed in testing')
+        app.config.setdefault('PASSWORD_HASH_POOL_SIZE', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 16)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+        app.extensions['password_hasher'] = {
+            'slots': threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING']),
+            'lock': threading.Lock(),
+            'pool': None,
+            'pid': None
+        }
+
+    @property
+    def method(self) -> str:
+        """Return the hash method of the current application."""
+        if has_app_context():
+            return current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        return DEFAULT_METHOD
+
+    def hash(self, password: str) -> str:
+        """Return the hash of password with the current method."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Return whether password matches password_hash, whatever its method."""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Return whether password_hash was made with other parameters than the current ones."""
+        return password_hash.split('$', 1)[0] != normalize_method(self.method)
+
+    def _run(self, function, *args):
+        """Call function in the process pool (or gevent's thread pool), waiting for a slot."""
+        if not has_app_context() or 'password_hasher' not in current_app.extensions:
+            return function(*args)
+        if not current_app.config['PASSWORD_HASH_POOL_SIZE']:
+            return function(*args)
+
+        state = current_app.extensions['password_hasher']
+        if not state['slots'].acquire(timeout=current_app.config['PASSWORD_HASH_TIMEOUT']):
+            raise PasswordHashingBusy('Too many passwords are being hashed')
+        try:
+            threadpool = gevent_threadpool()
+            if threadpool is not None:
+                return threadpool.apply(function, args)
+            return self._pool(state).submit(function, *args).result()
+        finally:
+            state['slots'].release()
+
+    @staticmethod
+    def _pool(state) -> ProcessPoolExecutor:
+        """Return the pool of this process, starting it on first use (after any fork)."""
+        with state['lock']:
+            if state['pool'] is None or state['pid'] != os.getpid():
+                # Spawned, not forked: the web worker may be running threads or greenlets
+                state['pool'] = ProcessPoolExecutor(
+                    max_workers=current_app.config['PASSWORD_HASH_POOL_SIZE'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                state['pid'] = os.getpid()
+            return state['pool']
+
+
+password_hasher = PasswordHasher()
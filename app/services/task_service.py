@@ -1,14 +1,46 @@
 """Task service module."""
+import base64
+import binascii
+import json
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, insert, select, tuple_, update
+from app.metrics import record_writes
+from app.services.dashboard_cache import dashboard_cache
 from app.models import Task, User
+from app.models.task import VALID_STATUSES as MODEL_STATUSES
 from app import db
 
+
+def encode_task_cursor(task: Task) -> str:
+    """Encode the (due_date, id) position of a task as an opaque cursor."""
+    due_date = task.due_date.isoformat() if task.due_date else None
+    payload = json.dumps([due_date, task.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_task_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor produced by encode_task_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        due_date, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if due_date is not None:
+            due_date = datetime.fromisoformat(due_date)
+        if not isinstance(task_id, int):
+            raise ValueError
+        return due_date, task_id
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
 class TaskService:
     """Service class for handling task operations."""
 
     VALID_CATEGORIES = ['personal', 'work', 'shopping', 'health', 'study']
     VALID_STATUSES = ['pending', 'in_progress', 'completed', 'cancelled']
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    MAX_BULK_SIZE = 500
 
     def create_task(self, user: User, title: str, category: str, status: str = 'pending',
                    description: Optional[str] = None, due_date: Optional[datetime] = None) -> Task:
@@ -47,7 +79,9 @@ class TaskService:
         )
         
         db.session.add(task)
+        user_id = user.id
         db.session.commit()
+        dashboard_cache.invalidate(user_id)
         
         return task
 
@@ -69,6 +103,52 @@ class TaskService:
             raise ValueError("Task not found")
         return task
 
+    def get_owned_task(self, user_id: int, task_id: int) -> Task:
+        """
+        Get a task by its ID, only if it belongs to the given user.
+        
+        Ownership is checked in the WHERE clause, so a missing task and a task
+        owned by someone else both resolve in a single query.
+        
+        Args:
+            user_id: The ID of the user who must own the task
+            task_id: The ID of the task to retrieve
+            
+        Returns:
+            Task: The task object if found and owned by the user
+            
+        Raises:
+            ValueError: If task is not found or belongs to another user
+        """
+        task = Task.query.filter_by(id=task_id, user_id=user_id).first()
+        if not task:
+            raise ValueError("Task not found")
+        return task
+
+    def get_owned_task_updated_at(self, user_id: int, task_id: int) -> Optional[datetime]:
+        """
+        Get when a task owned by the given user was last updated.
+        
+        Only the timestamp column is selected, so a conditional request can be
+        answered without loading the task.
+        
+        Args:
+            user_id: The ID of the user who must own the task
+            task_id: The ID of the task
+            
+        Returns:
+            Optional[datetime]: The task's updated_at
+            
+        Raises:
+            ValueError: If task is not found or belongs to another user
+        """
+        row = db.session.execute(
+            select(Task.updated_at).where(Task.id == task_id, Task.user_id == user_id)
+        ).first()
+        if row is None:
+            raise ValueError("Task not found")
+        return row.updated_at
+
     def get_user_tasks(
         self,
         user: User,
@@ -96,6 +176,80 @@ class TaskService:
         
         return query.all()
 
+    def get_user_tasks_page(
+        self,
+        user: User,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        Get one page of a user's tasks using keyset pagination.
+        
+        Tasks are ordered by (due_date, id) with undated tasks last, and each
+        page continues right after the position encoded in the cursor, so the
+        cost of a page does not depend on how deep into the list it is. The
+        dated and undated tasks are read as separate index ranges; only the
+        page where the dated tasks run out reads both.
+        
+        Args:
+            user: The user whose tasks to retrieve
+            status: Optional status filter
+            category: Optional category filter
+            limit: Maximum number of tasks in the page
+            cursor: Opaque cursor returned with the previous page
+            
+        Returns:
+            Tuple[List[Task], Optional[str]]: The tasks of the page and the
+                cursor of the next page (None on the last page)
+            
+        Raises:
+            ValueError: If a filter or the cursor is invalid
+        """
+        query = Task.query.filter_by(user=user)
+
+        if status:
+            if status not in self.VALID_STATUSES:
+                raise ValueError(f"Invalid status. Must be one of: {', '.join(self.VALID_STATUSES)}")
+            query = query.filter_by(status=status)
+
+        if category:
+            if category not in self.VALID_CATEGORIES:
+                raise ValueError(f"Invalid category. Must be one of: {', '.join(self.VALID_CATEGORIES)}")
+            query = query.filter_by(category=category)
+
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        undated = query.filter(Task.due_date.is_(None)).order_by(Task.id.asc())
+        if not cursor:
+            tasks = (
+                query.order_by(Task.due_date.asc().nulls_last(), Task.id.asc())
+                .limit(limit + 1)
+                .all()
+            )
+        else:
+            due_date, task_id = decode_task_cursor(cursor)
+            if due_date is None:
+                tasks = undated.filter(Task.id > task_id).limit(limit + 1).all()
+            else:
+                # A row-value comparison is a range on the (user_id, due_date, id)
+                # index; NULL due dates never compare greater, so it stays dated
+                tasks = (
+                    query.filter(tuple_(Task.due_date, Task.id) > tuple_(due_date, task_id))
+                    .order_by(Task.due_date.asc(), Task.id.asc())
+                    .limit(limit + 1)
+                    .all()
+                )
+                if len(tasks) <= limit:
+                    # The undated tasks follow the last dated one
+                    tasks += undated.limit(limit + 1 - len(tasks)).all()
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_task_cursor(tasks[-1])
+        return tasks, next_cursor
+
     def update_task(self, task: Task, update_data: dict) -> Task:
         """
         Update a task's information.
@@ -132,7 +286,9 @@ class TaskService:
             task.due_date = update_data['due_date']
 
         task.updated_at = datetime.now(timezone.utc)
+        user_id = task.user_id
         db.session.commit()
+        dashboard_cache.invalidate(user_id)
         
         return task
 
@@ -155,5 +311,126 @@ class TaskService:
         Args:
             task: The task object to delete
         """
+        user_id = task.user_id
         db.session.delete(task)
-        db.session.commit() 
\ No newline at end of file
+        db.session.commit()
+        dashboard_cache.invalidate(user_id)
+
+    def bulk_create_tasks(self, user: User, tasks_data: List[dict]) -> List[Task]:
+        """
+        Create many tasks with a single INSERT and a single commit.
+        
+        Args:
+            user: The user who owns the tasks
+            tasks_data: List of dictionaries with the create_task fields
+                (title, category and optionally status, description, due_date)
+            
+        Returns:
+            List[Task]: The newly created task objects
+            
+        Raises:
+            ValueError: If any task is invalid; nothing is created in that case
+        """
+        self._check_bulk_size(tasks_data)
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for data in tasks_data:
+            if not data.get('title'):
+                raise ValueError("Title is required")
+            if data.get('category') not in self.VALID_CATEGORIES:
+                raise ValueError("Invalid category")
+            status = data.get('status') or 'pending'
+            # The INSERT bypasses the Task constructor, so apply its checks
+            if status not in MODEL_STATUSES:
+                raise ValueError("Invalid status")
+            due_date = data.get('due_date')
+            if due_date and due_date.tzinfo is None:
+                due_date = due_date.replace(tzinfo=timezone.utc)
+            rows.append({
+                'title': data['title'],
+                'description': data.get('description') or '',
+                'category': data['category'],
+                'status': status,
+                'due_date': due_date,
+                'user_id': user.id,
+                'created_at': now,
+                'updated_at': now,
+                'completed_at': now if status == 'completed' else None
+            })
+
+        if not rows:
+            return []
+        tasks = list(db.session.scalars(insert(Task).returning(Task), rows))
+        record_writes(db.session, 'task', 'create', len(tasks))
+        db.session.commit()
+        dashboard_cache.invalidate(rows[0]['user_id'])
+        return tasks
+
+    def bulk_update_status(self, user: User, task_ids: Iterable[int], status: str) -> int:
+        """
+        Set the status of many of a user's tasks with a single UPDATE.
+        
+        Args:
+            user: The user who owns the tasks; ids of other users' tasks are ignored
+            task_ids: The IDs of the tasks to update
+            status: The new status
+            
+        Returns:
+            int: The number of tasks updated
+            
+        Raises:
+            ValueError: If the status is invalid
+        """
+        if status not in MODEL_STATUSES:
+            raise ValueError("Invalid status")
+        task_ids = self._check_bulk_size(task_ids)
+        if not task_ids:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        values = {'status': status, 'updated_at': now}
+        if status == 'completed':
+            values['completed_at'] = now
+
+        user_id = user.id
+        result = db.session.execute(
+            update(Task)
+            .where(Task.user_id == user_id, Task.id.in_(task_ids))
+            .values(**values)
+        )
+        record_writes(db.session, 'task', 'update', result.rowcount)
+        db.session.commit()
+        dashboard_cache.invalidate(user_id)
+        return result.rowcount
+
+    def bulk_delete(self, user: User, task_ids: Iterable[int]) -> int:
+        """
+        Delete many of a user's tasks with a single DELETE.
+        
+        Args:
+            user: The user who owns the tasks; ids of other users' tasks are ignored
+            task_ids: The IDs of the tasks to delete
+            
+        Returns:
+            int: The number of tasks deleted
+        """
+        task_ids = self._check_bulk_size(task_ids)
+        if not task_ids:
+            return 0
+
+        user_id = user.id
+        result = db.session.execute(
+            delete(Task).where(Task.user_id == user_id, Task.id.in_(task_ids))
+        )
+        record_writes(db.session, 'task', 'delete', result.rowcount)
+        db.session.commit()
+        dashboard_cache.invalidate(user_id)
+        return result.rowcount
+
+    def _check_bulk_size(self, items: Iterable) -> list:
+        """Return items as a list, rejecting batches over MAX_BULK_SIZE."""
+        items = list(items)
+        if len(items) > self.MAX_BULK_SIZE:
+            raise ValueError(f"Too many tasks. Maximum is {self.MAX_BULK_SIZE} per request")
+        return items
@@ -1,7 +1,10 @@
 """Travel service module."""
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import List, Optional
+from sqlalchemy import case, func, select, union_all
+from sqlalchemy.orm import joinedload, selectinload
 from app.models import TravelDiary, Activity, User
+from app.services.dashboard_cache import dashboard_cache
 from app import db
 
 def make_timezone_aware(dt: datetime) -> datetime:
@@ -11,6 +14,8 @@ def make_timezone_aware(dt: datetime) -> datetime:
 class TravelService:
     """Service class for handling travel diary operations."""
 
+    LOADING_STRATEGIES = ['lazy', 'selectin', 'joined', 'counts']
+
     def create_travel_diary(self, user: User, title: str, location: str,
                           start_date: Optional[datetime] = None,
                           end_date: Optional[datetime] = None,
@@ -48,7 +53,9 @@ class TravelService:
         )
         
         db.session.add(diary)
+        user_id = user.id
         db.session.commit()
+        dashboard_cache.invalidate(user_id)
         
         return diary
 
@@ -70,17 +77,193 @@ class TravelService:
             raise ValueError("Travel diary not found")
         return diary
 
-    def get_user_diaries(self, user: User) -> List[TravelDiary]:
+    def get_owned_diary(self, user_id: int, diary_id: int) -> TravelDiary:
+        """
+        Get a travel diary by ID, only if it belongs to the given user.
+        
+        Args:
+            user_id: The ID of the user who must own the diary
+            diary_id: The ID of the diary to retrieve
+            
+        Returns:
+            TravelDiary: The travel diary object
+            
+        Raises:
+            ValueError: If diary is not found or belongs to another user
+        """
+        diary = TravelDiary.query.filter_by(id=diary_id, user_id=user_id).first()
+        if not diary:
+            raise ValueError("Travel diary not found")
+        return diary
+
+    def get_owned_diary_updated_at(self, user_id: int, diary_id: int) -> Optional[datetime]:
+        """
+        Get when a travel diary owned by the given user was last updated.
+        
+        Only the timestamp column is selected, so a conditional request can be
+        answered without loading the diary.
+        
+        Args:
+            user_id: The ID of the user who must own the diary
+            diary_id: The ID of the diary
+            
+        Returns:
+            Optional[datetime]: The diary's updated_at
+            
+        Raises:
+            ValueError: If diary is not found or belongs to another user
+        """
+        row = db.session.execute(
+            select(TravelDiary.updated_at)
+            .where(TravelDiary.id == diary_id, TravelDiary.user_id == user_id)
+        ).first()
+        if row is None:
+            raise ValueError("Travel diary not found")
+        return row.updated_at
+
+    def get_owned_activity(self, user_id: int, activity_id: int) -> Activity:
+        """
+        Get an activity by ID, only if its diary belongs to the given user.
+        
+        Ownership is checked by joining through travel_diaries in the same
+        query, instead of lazy loading the diary and then its user.
+        
+        Args:
+            user_id: The ID of the user who must own the activity's diary
+            activity_id: The ID of the activity to retrieve
+            
+        Returns:
+            Activity: The activity object
+            
+        Raises:
+            ValueError: If activity is not found or belongs to another user
+        """
+        activity = (
+            Activity.query
+            .join(TravelDiary, Activity.diary_id == TravelDiary.id)
+            .filter(Activity.id == activity_id, TravelDiary.user_id == user_id)
+            .first()
+        )
+        if not activity:
+            raise ValueError("Activity not found")
+        return activity
+
+    def get_owned_activity_updated_at(self, user_id: int, activity_id: int) -> Optional[datetime]:
+        """
+        Get when an activity whose diary belongs to the given user was last updated.
+        
+        Args:
+            user_id: The ID of the user who must own the activity's diary
+            activity_id: The ID of the activity
+            
+        Returns:
+            Optional[datetime]: The activity's updated_at
+            
+        Raises:
+            ValueError: If activity is not found or belongs to another user
+        """
+        row = db.session.execute(
+            select(Activity.updated_at)
+            .join(TravelDiary, Activity.diary_id == TravelDiary.id)
+            .where(Activity.id == activity_id, TravelDiary.user_id == user_id)
+        ).first()
+        if row is None:
+            raise ValueError("Activity not found")
+        return row.updated_at
+
+    def get_user_diaries(self, user: User, loading: str = 'lazy') -> List[TravelDiary]:
         """
         Get all travel diaries for a user.
         
         Args:
             user: The user whose diaries to retrieve
+            loading: How to load the activities of each diary. 'lazy' loads them
+                on first access, 'selectin' and 'joined' load them together with
+                the diaries, and 'counts' only loads the number of activities
+                (available through ``diary.activity_count``)
             
         Returns:
             List[TravelDiary]: List of travel diaries
+            
+        Raises:
+            ValueError: If loading is not a valid loading strategy
         """
-        return TravelDiary.query.filter_by(user=user).order_by(TravelDiary.start_date).all()
+        if loading not in self.LOADING_STRATEGIES:
+            raise ValueError(f"Invalid loading strategy. Must be one of: {', '.join(self.LOADING_STRATEGIES)}")
+
+        if loading == 'counts':
+            return self._with_activity_counts(
+                db.session.query(TravelDiary, self._activity_count())
+                .filter(TravelDiary.user_id == user.id)
+                .order_by(TravelDiary.start_date)
+            )
+
+        query = TravelDiary.query.filter_by(user=user)
+        if loading == 'selectin':
+            query = query.options(selectinload(TravelDiary.activities))
+        elif loading == 'joined':
+            query = query.options(joinedload(TravelDiary.activities))
+
+        return query.order_by(TravelDiary.start_date).all()
+
+    def get_upcoming_diaries(self, user: User, now: Optional[datetime] = None,
+                             limit: int = 5) -> List[TravelDiary]:
+        """
+        Get a user's next trips, including those in progress, with their activity counts.
+        
+        Args:
+            user: The user whose diaries to retrieve
+            now: The current time (defaults to the current UTC time)
+            limit: The maximum number of diaries to return
+            
+        Returns:
+            List[TravelDiary]: Diaries that have not ended, by start date
+        """
+        now = make_timezone_aware(now) if now else datetime.now(timezone.utc)
+        # Upcoming trips are a range on (user_id, start_date) and trips in
+        # progress a range on (user_id, end_date), so past trips are never read
+        upcoming = (
+            select(TravelDiary.id)
+            .where(TravelDiary.user_id == user.id, TravelDiary.start_date >= now)
+            .order_by(TravelDiary.start_date)
+            .limit(limit)
+            .subquery()
+        )
+        in_progress = (
+            select(TravelDiary.id)
+            .where(TravelDiary.user_id == user.id, TravelDiary.end_date >= now,
+                   TravelDiary.start_date < now)
+        )
+        diary_ids = union_all(select(upcoming.c.id), in_progress)
+        return self._with_activity_counts(
+            db.session.query(TravelDiary, self._activity_count())
+            .filter(TravelDiary.id.in_(diary_ids))
+            .order_by(TravelDiary.start_date)
+            .limit(limit)
+        )
+
+    @staticmethod
+    def _activity_count():
+        """
+        Return a correlated count of a diary's activities.
+
+        A correlated count keeps the diaries on their indexes; grouping a join
+        by diary id makes the planner scan them all.
+        """
+        return (
+            select(func.count(Activity.id))
+            .where(Activity.diary_id == TravelDiary.id)
+            .correlate(TravelDiary)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _with_activity_counts(query) -> List[TravelDiary]:
+        """Run a query of (diary, activity count) rows and attach the counts."""
+        rows = query.all()
+        for diary, activity_count in rows:
+            diary.set_activity_count(activity_count)
+        return [diary for diary, _ in rows]
 
     def add_activity(self, diary: TravelDiary, title: str, planned_date: datetime,
                     description: Optional[str] = None, location: Optional[str] = None,
@@ -103,17 +286,7 @@ class TravelService:
         Raises:
             ValueError: If planned_date is outside diary date range
         """
-        # Ensure planned_date is timezone aware
-        planned_date = make_timezone_aware(planned_date)
-
-        # Ensure diary dates are timezone aware
-        start_date = make_timezone_aware(diary.start_date)
-        end_date = make_timezone_aware(diary.end_date) if diary.end_date else None
-        
-        if end_date and planned_date > end_date:
-            raise ValueError("Activity date must be within diary date range")
-        if planned_date < start_date:
-            raise ValueError("Activity date must be within diary date range")
+        planned_date = self._check_activity_date(diary, planned_date)
 
         activity = Activity(
             title=title,
@@ -124,12 +297,56 @@ class TravelService:
             notes=notes,
             diary=diary
         )
+        user_id = diary.user_id
         
         db.session.add(activity)
         db.session.commit()
+        dashboard_cache.invalidate(user_id)
         
         return activity
 
+    def update_activity(self, activity: Activity, update_data: dict) -> Activity:
+        """
+        Update an activity's information.
+        
+        The caller is expected to have loaded the activity with
+        get_owned_activity, which scopes it to its owner.
+        
+        Args:
+            activity: The activity object to update
+            update_data: Dictionary containing the fields to update
+            
+        Returns:
+            Activity: The updated activity object
+            
+        Raises:
+            ValueError: If the new planned_date is outside diary date range
+        """
+        diary = activity.diary
+        if 'planned_date' in update_data:
+            activity.planned_date = self._check_activity_date(diary, update_data['planned_date'])
+        for field in ('title', 'description', 'location', 'cost', 'notes'):
+            if field in update_data:
+                setattr(activity, field, update_data[field])
+
+        user_id = diary.user_id
+        db.session.commit()
+        dashboard_cache.invalidate(user_id)
+        return activity
+
+    @staticmethod
+    def _check_activity_date(diary: TravelDiary, planned_date: datetime) -> datetime:
+        """Return planned_date as a timezone aware datetime, checking it is within the diary's dates."""
+        planned_date = make_timezone_aware(planned_date)
+        start_date = make_timezone_aware(diary.start_date)
+        end_date = make_timezone_aware(diary.end_date) if diary.end_date else None
+        
+        if end_date and planned_date > end_date:
+            raise ValueError("Activity date must be within diary date range")
+        if planned_date < start_date:
+            raise ValueError("Activity date must be within diary date range")
+        return planned_date
+
     def get_diary_activities(self, diary: TravelDiary) -> List[Activity]:
         """
         Get all activities for a travel diary.
@@ -142,6 +359,55 @@ class TravelService:
         """
         return Activity.query.filter_by(diary=diary).order_by(Activity.planned_date).all()
 
+    def get_diary_summary(self, diary: TravelDiary) -> dict:
+        """
+        Get aggregated activity figures for a travel diary.
+        
+        The figures are computed by the database in a single GROUP BY query,
+        so the activities themselves are never loaded.
+        
+        Args:
+            diary: The diary to summarize
+            
+        Returns:
+            dict: total_activities, completed_activities, total_cost,
+                remaining_cost and cost_per_day (list of (date, cost) tuples
+                ordered by date; activities without a date are grouped under None)
+        """
+        day = func.date(Activity.planned_date)
+        cost = func.coalesce(Activity.cost, 0)
+        rows = (
+            db.session.query(
+                day,
+                func.count(Activity.id),
+                func.sum(case((Activity.is_completed.is_(True), 1), else_=0)),
+                func.sum(cost),
+                func.sum(case((Activity.is_completed.is_(True), 0), else_=cost))
+            )
+            .filter(Activity.diary_id == diary.id)
+            .group_by(day)
+            .order_by(day)
+            .all()
+        )
+
+        summary = {
+            'total_activities': 0,
+            'completed_activities': 0,
+            'total_cost': 0.0,
+            'remaining_cost': 0.0,
+            'cost_per_day': []
+        }
+        for activity_day, total, completed, total_cost, remaining_cost in rows:
+            # SQLite returns date() results as ISO strings
+            if isinstance(activity_day, str):
+                activity_day = date.fromisoformat(activity_day)
+            summary['total_activities'] += total
+            summary['completed_activities'] += completed or 0
+            summary['total_cost'] += float(total_cost or 0)
+            summary['remaining_cost'] += float(remaining_cost or 0)
+            summary['cost_per_day'].append((activity_day, float(total_cost or 0)))
+        return summary
+
     def mark_activity_completed(self, activity: Activity, completion_notes: Optional[str] = None) -> Activity:
         """
         Mark an activity as completed.
@@ -186,7 +452,9 @@ class TravelService:
         if diary.start_date and diary.end_date and diary.end_date < diary.start_date:
             raise ValueError("End date cannot be before start date")
 
+        user_id = diary.user_id
         db.session.commit()
+        dashboard_cache.invalidate(user_id)
         return diary
 
     def delete_diary(self, diary: TravelDiary) -> None:
@@ -196,5 +464,19 @@ class TravelService:
         Args:
             diary: The diary to delete
         """
+        user_id = diary.user_id
         db.session.delete(diary)
-        db.session.commit() 
\ No newline at end of file
+        db.session.commit()
+        dashboard_cache.invalidate(user_id)
+
+    def delete_activity(self, activity: Activity) -> None:
+        """
+        Delete an activity.
+        
+        Args:
+            activity: The activity to delete
+        """
+        user_id = activity.diary.user_id
+        db.session.delete(activity)
+        db.session.commit()
+        dashboard_cache.invalidate(user_id) 
@@ -0,0 +1,116 @@
+"""Cache of the authenticated user's identity fields."""
+from datetime import datetime
+from typing import Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.cache import create_cache
+from app.models import User
+from app import db
+
+CACHED_FIELDS = ('id', 'username', 'email', 'active', 'created_at', 'updated_at')
+DATETIME_FIELDS = ('created_at', 'updated_at')
+PENDING_KEY = 'user_cache_pending'
+
+
+class UserCache:
+    """
+    Cache used by the Flask-Login user loader.
+
+    Only identity fields are cached; a hit is turned back into a User bound
+    to the current session without querying the database. Entries are
+    invalidated after any commit that updates or deletes the user.
+    """
+
+    def init_app(self, app):
+        """Create the cache backend for app."""
+        app.config.setdefault('USER_CACHE_ENABLED', True)
+        app.config.setdefault('USER_CACHE_TTL', 60)
+        app.config.setdefault('USER_CACHE_SIZE', 1024)
+        app.extensions['user_cache'] = create_cache(
+            app,
+            prefix='user:',
+            maxsize=app.config['USER_CACHE_SIZE'],
+            ttl=app.config['USER_CACHE_TTL']
+        )
+
+    @property
+    def backend(self):
+        """Return the cache backend of the current application."""
+        return current_app.extensions['user_cache']
+
+    def load_user(self, user_id: int) -> Optional[User]:
+        """
+        Get a user by ID, from the cache when possible.
+
+        Args:
+            user_id: The ID of the user to load
+
+        Returns:
+            Optional[User]: The user, or None if it does not exist
+        """
+        if not current_app.config['USER_CACHE_ENABLED']:
+            return db.session.get(User, user_id)
+
+        fields = self.backend.get(str(user_id))
+        if fields is not None:
+            return self._restore(fields)
+
+        user = db.session.get(User, user_id)
+        if user is not None:
+            self.backend.set(str(user_id), self._dump(user))
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """Remove a user from the cache."""
+        self.backend.delete(str(user_id))
+
+    @staticmethod
+    def _dump(user: User) -> dict:
+        """Return the cached fields of user as JSON-compatible values."""
+        fields = {name: getattr(user, name) for name in CACHED_FIELDS}
+        for name in DATETIME_FIELDS:
+            if fields[name] is not None:
+                fields[name] = fields[name].isoformat()
+        return fields
+
+    @staticmethod
+    def _restore(fields: dict) -> User:
+        """Build a User from cached fields and attach it to the session."""
+        user = User.__mapper__.class_manager.new_instance()
+        for name in CACHED_FIELDS:
+            value = fields[name]
+            if name in DATETIME_FIELDS and value is not None:
+                value = datetime.fromisoformat(value)
+            setattr(user, name, value)
+        # The remaining columns are marked expired and load on first access
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    """Remember the users updated or deleted by this flush."""
+    changed = [obj for obj in session.dirty
+               if isinstance(obj, User) and session.is_modified(obj, include_collections=False)]
+    changed += [obj for obj in session.deleted if isinstance(obj, User)]
+    if changed:
+        session.info.setdefault(PENDING_KEY, set()).update(user.id for user in changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    """Drop the committed users from the cache."""
+    user_ids = session.info.pop(PENDING_KEY, None)
+    if user_ids and has_app_context() and 'user_cache' in current_app.extensions:
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    """Forget the users of a rolled back transaction."""
+    session.info.pop(PENDING_KEY, None)
@@ -1,9 +1,40 @@
 """User service module."""
 import re
 from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from app.models import User
+from app.models.user import normalize_email
+from app.services.password_hasher import password_hasher
 from app import db
 
+# The messages callers (and the registration form) expect, by unique column of users
+CONFLICT_MESSAGES = {'username': "Username already exists", 'email': "Email already exists"}
+
+
+class UniqueConflict(ValueError):
+    """Raised when a username or email is already taken by another user."""
+
+    def __init__(self, column: str):
+        """Create the error of the conflicting column ('username' or 'email')."""
+        super().__init__(CONFLICT_MESSAGES[column])
+        self.column = column
+
+
+def unique_conflict_column(error: IntegrityError) -> Optional[str]:
+    """Return the column of the unique constraint a failed INSERT/UPDATE of users hit, if any."""
+    # psycopg2 names the violated index; SQLite says "UNIQUE constraint failed: users.username"
+    # or, for the expression index, "UNIQUE constraint failed: index 'ix_users_email_lower'"
+    constraint = getattr(getattr(error.orig, 'diag', None), 'constraint_name', None)
+    text = (constraint or str(error.orig)).lower()
+    if constraint is None and 'unique' not in text:
+        return None
+    for column in CONFLICT_MESSAGES:
+        if column in text:
+            return column
+    return None
+
 class UserService:
     """Service class for handling user operations."""
 
@@ -15,6 +46,10 @@ class UserService:
         """
         Create a new user.
         
+        The user is inserted in a single statement; a duplicate username or
+        email is reported by the unique indexes of users instead of being
+        looked up first, which also holds for concurrent registrations.
+        
         Args:
             username: The username for the new user
             email: The email address for the new user
@@ -27,22 +62,22 @@ class UserService:
             ValueError: If username/email already exists or email format is invalid
         """
         # Validate email format
+        email = normalize_email(email or '')
         if not self.email_regex.match(email):
             raise ValueError("Invalid email format")
 
-        # Check if username already exists
-        if User.query.filter_by(username=username).first():
-            raise ValueError("Username already exists")
-
-        # Check if email already exists
-        if User.query.filter_by(email=email).first():
-            raise ValueError("Email already exists")
-
         user = User(username=username, email=email)
         user.password = password  # This will hash the password
         
         db.session.add(user)
-        db.session.commit()
+        try:
+            self._commit_unique()
+        except UniqueConflict as e:
+            # When both are taken, which index fails first is up to the
+            # database; the username has always been the one reported
+            if e.column == 'email' and self._username_exists(username):
+                raise UniqueConflict('username') from None
+            raise
         
         return user
 
@@ -84,7 +119,10 @@ class UserService:
 
     def get_user_by_email(self, email: str) -> User:
         """
-        Get a user by their email address.
+        Get a user by their email address, ignoring case.
+        
+        The lookup compares lower(email), so it is served by the
+        ix_users_email_lower index.
         
         Args:
             email: The email address to search for
@@ -95,15 +133,41 @@ class UserService:
         Raises:
             ValueError: If user is not found
         """
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter(func.lower(User.email) == normalize_email(email)).first()
         if not user:
             raise ValueError("User not found")
         return user
 
+    def verify_password(self, user: User, password: str) -> bool:
+        """
+        Check a user's password, upgrading its hash to the current parameters.
+        
+        A hash made with an older method or work factor is replaced by a new
+        one of the same password once it has been verified.
+        
+        Args:
+            user: The user logging in
+            password: The password to check
+            
+        Returns:
+            bool: True if the password matches
+            
+        Raises:
+            PasswordHashingBusy: If too many passwords are already being hashed
+        """
+        if not user.check_password(password):
+            return False
+        if password_hasher.needs_rehash(user.password_hash):
+            user.password = password
+            db.session.commit()
+        return True
+
     def update_user(self, user: User, update_data: dict) -> User:
         """
         Update a user's information.
         
+        The user's entry in the login cache is dropped once the change is committed.
+        
         Args:
             user: The user object to update
             update_data: Dictionary containing the fields to update
@@ -115,17 +179,14 @@ class UserService:
             ValueError: If trying to update to an email that already exists
         """
         if 'email' in update_data:
-            # Check if new email already exists for a different user
-            existing_user = User.query.filter_by(email=update_data['email']).first()
-            if existing_user and existing_user.id != user.id:
-                raise ValueError("Email already exists")
+            # Another user's email is rejected by the unique index on commit
             user.email = update_data['email']
 
         if 'password' in update_data:
             user.password = update_data['password']
 
         user.updated_at = datetime.now(timezone.utc)
-        db.session.commit()
+        self._commit_unique()
         
         return user
 
@@ -133,8 +194,32 @@ class UserService:
         """
         Delete a user.
         
+        The user's entry in the login cache is dropped once the deletion is committed.
+        
         Args:
             user: The user object to delete
         """
         db.session.delete(user)
-        db.session.commit() 
\ No newline at end of file
+        db.session.commit() 
+
+    @staticmethod
+    def _username_exists(username: str) -> bool:
+        """Return whether a user already has this username."""
+        return db.session.query(User.id).filter_by(username=username).first() is not None
+
+    @staticmethod
+    def _commit_unique() -> None:
+        """
+        Commit, turning a unique constraint violation on users into a UniqueConflict.
+        
+        Raises:
+            UniqueConflict: If the username or the email is already taken
+        """
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            column = unique_conflict_column(e)
+            if column is None:
+                raise
+            raise UniqueConflict(column) from None
@@ -0,0 +1,165 @@
+"""Seeded synthetic data for benchmarks and load tests."""
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import insert
+from app import db
+from app.models import Activity, Task, TravelDiary, User
+from app.models.task import VALID_CATEGORIES, VALID_PRIORITIES
+from app.services.password_hasher import password_hasher
+
+PASSWORD = 'benchmark-password'
+CHUNK_SIZE = 1000
+WORDS = ('plan', 'review', 'call', 'buy', 'write', 'book', 'pack', 'visit', 'clean', 'study',
+         'report', 'museum', 'dinner', 'tickets', 'hotel', 'groceries', 'dentist', 'gym')
+CITIES = ('Bogotá', 'Lima', 'Madrid', 'Lisboa', 'Kyoto', 'Oslo', 'Quito', 'Roma')
+STATUSES = (('pending', 60), ('completed', 35), ('cancelled', 5))
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a generated dataset."""
+
+    users: int = 10
+    tasks_per_user: int = 100
+    diaries_per_user: int = 5
+    activities_per_diary: int = 10
+    seed: int = 1
+
+
+@dataclass
+class Dataset:
+    """Identifiers of the generated rows."""
+
+    spec: DatasetSpec
+    anchor: datetime
+    user_ids: List[int] = field(default_factory=list)
+    diary_ids: List[int] = field(default_factory=list)
+    task_count: int = 0
+    activity_count: int = 0
+
+    def describe(self) -> dict:
+        """Return the spec as a JSON-compatible dict."""
+        return asdict(self.spec)
+
+
+def user_email(index: int) -> str:
+    """Return the email of the index-th generated user (password: PASSWORD)."""
+    return f'user{index:05d}@example.com'
+
+
+def generate_dataset(spec: DatasetSpec, anchor: Optional[datetime] = None) -> Dataset:
+    """
+    Insert a synthetic dataset into the current application's database.
+
+    The same spec, seed and anchor always produce the same rows, password
+    salt aside. Dates are
+    spread around anchor (default: today at midnight UTC) so that
+    "upcoming" queries find a realistic share of the rows. Every user has
+    PASSWORD as password; it is hashed once and shared to keep generation
+    fast.
+
+    Args:
+        spec: How many rows of each kind to create
+        anchor: The moment dates are generated around
+
+    Returns:
+        Dataset: The ids of the generated users and diaries
+    """
+    if anchor is None:
+        anchor = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    rng = random.Random(spec.seed)
+    dataset = Dataset(spec=spec, anchor=anchor)
+    categories = sorted(VALID_CATEGORIES)
+    priorities = sorted(VALID_PRIORITIES)
+    statuses = [status for status, _ in STATUSES]
+    weights = [weight for _, weight in STATUSES]
+    password_hash = password_hasher.hash(PASSWORD)
+    created_at = anchor - timedelta(days=365)
+
+    users = [{
+        'username': f'user{index:05d}',
+        'email': user_email(index),
+        'password_hash': password_hash,
+        'active': True,
+        'created_at': created_at,
+        'updated_at': created_at
+    } for index in range(spec.users)]
+    dataset.user_ids = _insert(User, users)
+
+    tasks = []
+    diaries = []
+    for user_id in dataset.user_ids:
+        for _ in range(spec.tasks_per_user):
+            status = rng.choices(statuses, weights)[0]
+            due_date = anchor + timedelta(days=rng.randint(-60, 120), hours=rng.randint(0, 23))
+            tasks.append({
+                'title': _title(rng),
+                'description': _title(rng, 8),
+                'due_date': due_date if rng.random() > 0.05 else None,
+                'category': rng.choice(categories),
+                'priority': rng.choice(priorities),
+                'status': status,
+                'user_id': user_id,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'completed_at': due_date if status == 'completed' else None
+            })
+        for _ in range(spec.diaries_per_user):
+            start_date = anchor + timedelta(days=rng.randint(-90, 180))
+            diaries.append({
+                'title': f'Trip to {rng.choice(CITIES)}',
+                'location': rng.choice(CITIES),
+                'description': _title(rng, 12),
+                'start_date': start_date,
+                'end_date': start_date + timedelta(days=rng.randint(1, 14)),
+                'user_id': user_id,
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+    _insert(Task, tasks, returning=False)
+    dataset.task_count = len(tasks)
+    dataset.diary_ids = _insert(TravelDiary, diaries)
+
+    activities = []
+    for diary_id, diary in zip(dataset.diary_ids, diaries):
+        length = (diary['end_date'] - diary['start_date']).days
+        for _ in range(spec.activities_per_diary):
+            completed = rng.random() < 0.3
+            activities.append({
+                'title': _title(rng),
+                'description': _title(rng, 6),
+                'planned_date': diary['start_date'] + timedelta(days=rng.randint(0, length),
+                                                                hours=rng.randint(8, 21)),
+                'location': rng.choice(CITIES),
+                'cost': round(rng.uniform(0, 250), 2),
+                'is_completed': completed,
+                'diary_id': diary_id,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'completed_at': diary['start_date'] if completed else None
+            })
+    _insert(Activity, activities, returning=False)
+    dataset.activity_count = len(activities)
+
+    db.session.commit()
+    return dataset
+
+
+def _title(rng: random.Random, words: int = 3) -> str:
+    """Return a few random words."""
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _insert(model, rows: List[dict], returning: bool = True) -> List[int]:
+    """Insert rows in chunks, returning their ids in order if requested."""
+    ids = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        if returning:
+            statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+            ids.extend(db.session.scalars(statement, chunk))
+        else:
+            db.session.execute(insert(model), chunk)
+    return ids
@@ -0,0 +1,313 @@
+"""
+Time the application's hot paths and compare them with a stored baseline.
+
+    python -m benchmarks.run                      # compare with benchmarks/baseline.json
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --save-baseline      # after an intended change
+
+The database (a temporary SQLite file unless --database is given) is filled
+with a seeded synthetic dataset. Each case is timed over --repeat runs after
+--warmup runs; a case regresses when its median grows by more than
+--threshold (and --min-delta-ms) or when it issues more SQL statements than
+in the baseline. A case found slower is timed a second time and only
+reported if that run is slow too, so one noisy run cannot fail the
+comparison. The login cache and the dashboard cache are disabled, so the
+cases time the query paths rather than cache hits. Timings are only
+comparable on the same machine and database, so keep one baseline per
+environment.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional
+import sqlalchemy
+from sqlalchemy import event, inspect
+from app import create_app, db
+from app.models import User
+from app.services.task_service import TaskService
+from app.services.travel_service import TravelService
+from benchmarks.dataset import PASSWORD, DatasetSpec, generate_dataset, user_email
+from benchmarks.stats import summarize
+from config import Config, TestingConfig
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+@dataclass
+class Case:
+    """A timed entry point; setup runs untimed and its result is passed to run."""
+
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    repeat: Optional[int] = None
+    app_context: bool = True
+
+
+def benchmark_config(database_uri: str):
+    """Return the configuration used to benchmark against database_uri."""
+    return type('BenchmarkConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQL_QUERY_BUDGET': 'off',
+        'SQL_RECORD_QUERIES': False,
+        # Every virtual user logs in from the same address
+        'RATELIMIT_ENABLED': False,
+        # Time the queries behind the views, not cache hits
+        'USER_CACHE_ENABLED': False,
+        'DASHBOARD_CACHE_ENABLED': False,
+        # Time logins with the production work factor, not the tests' cheap one
+        'PASSWORD_HASH_METHOD': Config.PASSWORD_HASH_METHOD
+    })
+
+
+def prepare_database(app, spec: DatasetSpec, reset: bool = False):
+    """Create the schema and generate the dataset; refuse to touch existing tables."""
+    with app.app_context():
+        if inspect(db.engine).get_table_names():
+            if not reset:
+                raise SystemExit(f'{db.engine.url!r} already has tables; pass --reset to drop them')
+            db.drop_all()
+        db.create_all()
+        return generate_dataset(spec)
+
+
+def logged_in_client(app, index: int = 0):
+    """Return a test client logged in as the index-th generated user."""
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': user_email(index), 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'Login failed with status {response.status_code}')
+    return client
+
+
+def expect_ok(response):
+    """Fail the benchmark on an error response instead of timing it."""
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.request.path} returned {response.status_code}')
+    return response
+
+
+def build_cases(app, dataset) -> List[Case]:
+    """Return the benchmarked entry points."""
+    user_id = dataset.user_ids[0]
+    diary_id = dataset.diary_ids[0]
+    client = logged_in_client(app)
+    task_service = TaskService()
+    travel_service = TravelService()
+
+    def load_user():
+        return (db.session.get(User, user_id),)
+
+    def load_serialized():
+        user = db.session.get(User, user_id)
+        return (task_service.get_user_tasks(user),
+                travel_service.get_user_diaries(user, loading='selectin'))
+
+    def serialize(tasks, diaries):
+        return [task.to_dict() for task in tasks], [diary.to_dict() for diary in diaries]
+
+    def login(login_client):
+        expect_ok(login_client.post('/auth/login', data={'email': user_email(0), 'password': PASSWORD}))
+
+    return [
+        Case('task_service.get_user_tasks', lambda user: task_service.get_user_tasks(user), load_user),
+        Case('task_service.get_user_tasks.pending',
+             lambda user: task_service.get_user_tasks(user, status='pending', limit=5), load_user),
+        Case('travel_service.get_user_diaries.counts',
+             lambda user: travel_service.get_user_diaries(user, loading='counts'), load_user),
+        Case('travel_service.get_user_diaries.selectin',
+             lambda user: travel_service.get_user_diaries(user, loading='selectin'), load_user),
+        Case('serialize.to_dict', serialize, load_serialized),
+        Case('view.index', lambda: expect_ok(client.get('/')), app_context=False),
+        Case('view.tasks', lambda: expect_ok(client.get('/tasks')), app_context=False),
+        Case('view.travel', lambda: expect_ok(client.get('/travel')), app_context=False),
+        Case('view.travel_detail', lambda: expect_ok(client.get(f'/travel/{diary_id}')),
+             app_context=False),
+        # Dominated by password hashing, so fewer runs
+        Case('view.login', login, lambda: (app.test_client(),), repeat=5, app_context=False),
+    ]
+
+
+def measure(app, case: Case, repeat: int, warmup: int) -> dict:
+    """Time case and count the SQL statements of its last run."""
+    with app.app_context():
+        engine = db.engine
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    timings = []
+    repeat = case.repeat or repeat
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        for iteration in range(warmup + repeat):
+            context = app.app_context() if case.app_context else None
+            if context is not None:
+                context.push()
+            try:
+                args = case.setup() if case.setup else ()
+                statements[0] = 0
+                start = time.perf_counter()
+                case.run(*args)
+                elapsed = time.perf_counter() - start
+            finally:
+                if context is not None:
+                    context.pop()
+            if iteration >= warmup:
+                timings.append(elapsed)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    result = summarize(timings)
+    result.update({'runs': len(timings), 'queries': statements[0]})
+    return result
+
+
+def run_benchmarks(app, dataset, repeat: int = 50, warmup: int = 3,
+                   only: Optional[str] = None, names: Optional[Iterable[str]] = None) -> dict:
+    """Run every case (or those whose name contains only, or is in names) and return the report."""
+    results = {}
+    for case in build_cases(app, dataset):
+        if only and only not in case.name:
+            continue
+        if names is not None and case.name not in names:
+            continue
+        results[case.name] = measure(app, case, repeat, warmup)
+    with app.app_context():
+        database = db.engine.dialect.name
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'dataset': dataset.describe(),
+            'database': database,
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+            'warmup': warmup
+        },
+        'results': results
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.5,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Return a description of every regression of report against baseline.
+
+    Args:
+        report: The results of this run
+        baseline: The stored results to compare with
+        threshold: Allowed relative growth of the median
+        min_delta_ms: Allowed absolute growth of the median, to ignore noise
+
+    Returns:
+        List[str]: One line per regression; empty if there is none
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {base['queries']} -> {result['queries']} queries")
+        if is_slower(result, base, threshold, min_delta_ms):
+            delta = result['p50_ms'] - base['p50_ms']
+            regressions.append(f"{name}: median {base['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms "
+                               f"(+{delta / base['p50_ms']:.0%})")
+    return regressions
+
+
+def is_slower(result: dict, base: dict, threshold: float, min_delta_ms: float) -> bool:
+    """Return whether the median of result grew beyond both allowances."""
+    delta = result['p50_ms'] - base['p50_ms']
+    return delta > min_delta_ms and result['p50_ms'] > base['p50_ms'] * (1 + threshold)
+
+
+def recheck_slower(app, dataset, report: dict, baseline: dict, threshold: float,
+                   min_delta_ms: float, repeat: int, warmup: int) -> None:
+    """Time the cases found slower again, keeping the faster of the two runs in report."""
+    slower = [name for name, result in report['results'].items()
+              if name in baseline.get('results', {})
+              and is_slower(result, baseline['results'][name], threshold, min_delta_ms)]
+    if not slower:
+        return
+    rerun = run_benchmarks(app, dataset, repeat=repeat, warmup=warmup, names=slower)
+    for name, result in rerun['results'].items():
+        if result['p50_ms'] < report['results'][name]['p50_ms']:
+            report['results'][name] = result
+
+
+def print_report(report: dict, baseline: Optional[dict]) -> None:
+    """Print the results as a table, next to the baseline medians if any."""
+    print(f"{'case':45} {'p50 ms':>9} {'p95 ms':>9} {'queries':>7} {'baseline':>9}")
+    for name, result in report['results'].items():
+        base = (baseline or {}).get('results', {}).get(name)
+        reference = f"{base['p50_ms']:9.2f}" if base else f"{'-':>9}"
+        print(f"{name:45} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+              f"{result['queries']:7d} {reference}")
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns 1 when a regression is found."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='SQLAlchemy URI (default: temporary SQLite file)')
+    parser.add_argument('--reset', action='store_true', help='drop existing tables in --database')
+    parser.add_argument('--users', type=int, default=DatasetSpec.users)
+    parser.add_argument('--tasks', type=int, default=DatasetSpec.tasks_per_user, help='tasks per user')
+    parser.add_argument('--diaries', type=int, default=DatasetSpec.diaries_per_user, help='diaries per user')
+    parser.add_argument('--activities', type=int, default=DatasetSpec.activities_per_diary,
+                        help='activities per diary')
+    parser.add_argument('--seed', type=int, default=DatasetSpec.seed)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help='run the cases whose name contains this text')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.5)
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    database = args.database
+    if database is None:
+        database = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='benchmarks-'), 'benchmark.db')}"
+    spec = DatasetSpec(users=args.users, tasks_per_user=args.tasks, diaries_per_user=args.diaries,
+                       activities_per_diary=args.activities, seed=args.seed)
+    app = create_app(benchmark_config(database))
+    dataset = prepare_database(app, spec, reset=args.reset)
+    report = run_benchmarks(app, dataset, repeat=args.repeat, warmup=args.warmup, only=args.only)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta']['dataset'] != report['meta']['dataset']:
+            print('Warning: the baseline was recorded with a different dataset', file=sys.stderr)
+        recheck_slower(app, dataset, report, baseline, args.threshold, args.min_delta_ms,
+                       args.repeat, args.warmup)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline written to {args.baseline}')
+    print_report(report, baseline)
+
+    regressions = compare(report, baseline, args.threshold, args.min_delta_ms) if baseline else []
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
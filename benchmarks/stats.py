@@ -0,0 +1,24 @@
+"""Summary statistics of timing samples."""
+import math
+from typing import Dict, Sequence
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of sorted samples, by nearest rank."""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Return the distribution of samples given in seconds, in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'min_ms': round(ordered[0] * 1000, 3) if ordered else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
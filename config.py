@@ -1,8 +1,86 @@
 """Configuration module."""
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
+
+def worker_concurrency(environ=os.environ):
+    """Return how many requests a single worker process serves at once."""
+    worker_class = environ.get('WORKER_CLASS') or 'sync'
+    if worker_class == 'gevent':
+        return int(environ.get('WORKER_CONNECTIONS') or 1000)
+    if worker_class == 'gthread':
+        return int(environ.get('WORKER_THREADS') or 4)
+    return 1
+
+def worker_count(environ=os.environ, cpu_count=None):
+    """
+    Return how many worker processes the WSGI server starts.
+    
+    WEB_CONCURRENCY overrides the default of one gevent worker per CPU (each
+    serves WORKER_CONNECTIONS requests concurrently) or (2 x CPUs) + 1 sync
+    or gthread workers.
+    """
+    if environ.get('WEB_CONCURRENCY'):
+        return int(environ['WEB_CONCURRENCY'])
+    cpus = cpu_count or os.cpu_count() or 1
+    if (environ.get('WORKER_CLASS') or 'sync') == 'gevent':
+        return cpus
+    return cpus * 2 + 1
+
+def statement_timeout_ms(environ=os.environ):
+    """Return the statement timeout in milliseconds (0 disables it)."""
+    return int(environ.get('DB_STATEMENT_TIMEOUT_MS') or 30000)
+
+def production_engine_options(environ=os.environ):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for production from environment variables.
+    
+    The pool of each worker process is sized from its concurrency: one
+    connection per thread, capped at 10 (plus up to 10 overflow connections)
+    for gevent workers, whose greenlets mostly wait on other I/O. Keep
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the server's
+    max_connections. Empty variables (as in .env.example) keep the defaults.
+    
+    With DB_POOL_MODE=transaction_proxy (PgBouncer in transaction pooling
+    mode) the proxy owns the pool, so connections are not kept by the
+    application and no startup options are sent, since the proxy would
+    reject them or leak them to other clients. The statement timeout is set
+    per transaction with SET LOCAL instead (see create_app).
+    """
+    connect_args = {'connect_timeout': int(environ.get('DB_CONNECT_TIMEOUT') or 5)}
+    
+    if (environ.get('DB_POOL_MODE') or 'direct') == 'transaction_proxy':
+        return {'poolclass': NullPool, 'connect_args': connect_args}
+    
+    concurrency = worker_concurrency(environ)
+    pool_size = int(environ.get('DB_POOL_SIZE') or min(concurrency, 10))
+    max_overflow = int(environ.get('DB_MAX_OVERFLOW') or max(min(concurrency - pool_size, 10), 0))
+    statement_timeout = statement_timeout_ms(environ)
+    if statement_timeout:
+        connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+    
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT') or 10),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE') or 1800),
+        'pool_pre_ping': (environ.get('DB_POOL_PRE_PING') or 'true').lower() == 'true',
+        'connect_args': connect_args
+    }
+
+def shared_dashboard_cache(environ=os.environ):
+    """
+    Return whether the dashboard cache can be enabled in production.
+    
+    The 'memory' backend is per worker process, and a write only invalidates
+    the dashboard cached by the worker that served it; with several workers
+    the others would show the old dashboard until it expires. The cache is
+    therefore only used with the shared 'redis' backend or a single worker.
+    """
+    return (environ.get('CACHE_BACKEND') or 'memory') != 'memory' or worker_count(environ) == 1
+
 class Config:
     """Base configuration."""
     
@@ -19,9 +97,79 @@ class Config:
     # SQLAlchemy
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Caching ('memory' per process, or 'redis' shared through CACHE_REDIS_URL)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    USER_CACHE_ENABLED = True
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    DASHBOARD_CACHE_ENABLED = True
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 60))
+    DASHBOARD_CACHE_SIZE = int(os.environ.get('DASHBOARD_CACHE_SIZE', 1024))
+    
+    # Rate limiting of the auth routes, per client address and per submitted email
+    # ('memory' per process, or 'redis' shared through RATELIMIT_REDIS_URL)
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', CACHE_BACKEND)
+    RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', CACHE_REDIS_URL)
+    RATELIMIT_LIMITS = {
+        'auth.login': {
+            'ip': os.environ.get('RATELIMIT_LOGIN_PER_IP', '20/minute'),
+            'email': os.environ.get('RATELIMIT_LOGIN_PER_EMAIL', '5/minute')
+        },
+        'auth.register': {
+            'ip': os.environ.get('RATELIMIT_REGISTER_PER_IP', '10/hour')
+        }
+    }
+    
+    # Password hashing (werkzeug method; the scrypt cost or pbkdf2 iterations are the work factor)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_POOL_SIZE = int(os.environ.get('PASSWORD_HASH_POOL_SIZE', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+    
+    # SQL instrumentation
+    SQL_INSTRUMENTATION_ENABLED = True
+    SQL_SLOW_QUERY_MS = int(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    SQL_QUERY_BUDGET = 'log'
+    
+    # Metrics (set PROMETHEUS_MULTIPROC_DIR to aggregate several worker processes)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_PATH = '/metrics'
+    METRICS_ALLOWED_NETWORKS = os.environ.get('METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Response compression (brotli is used when the brotli package is installed)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get('COMPRESS_BROTLI_LEVEL', 4))
+    
+    # Error reporting
+    SENTRY_DSN = os.environ.get('SENTRY_DSN')
+    SENTRY_ENVIRONMENT = os.environ.get('SENTRY_ENVIRONMENT', 'development')
+    SENTRY_TRACES_SAMPLE_RATE = float(os.environ.get('SENTRY_TRACES_SAMPLE_RATE', 0.0))
+
+class ProductionConfig(Config):
+    """Production configuration."""
+    DEBUG = False
+    SENTRY_ENVIRONMENT = os.environ.get('SENTRY_ENVIRONMENT', 'production')
+    DB_POOL_MODE = os.environ.get('DB_POOL_MODE') or 'direct'
+    DB_STATEMENT_TIMEOUT_MS = statement_timeout_ms()
+    SQLALCHEMY_ENGINE_OPTIONS = production_engine_options()
+    DASHBOARD_CACHE_ENABLED = shared_dashboard_cache()
+    # Refuse to start web processes against an outdated schema (see flask migrate-db)
+    SCHEMA_CHECK_ON_START = os.environ.get('SCHEMA_CHECK_ON_START', 'true').lower() == 'true'
 
 class TestingConfig(Config):
     """Testing configuration for unit tests."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    SQL_QUERY_BUDGET = 'raise'
+    SQL_RECORD_QUERIES = True
+    SENTRY_DSN = None
+    # A single pbkdf2 iteration: same hash format, a fraction of the cost (refused unless TESTING)
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1'
+    PASSWORD_HASH_POOL_SIZE = 0
@@ -0,0 +1,87 @@
+"""
+Gunicorn settings, read from the working directory by `gunicorn wsgi:app`.
+
+Every setting can be changed through the environment: WORKER_CLASS (sync,
+gthread or gevent), WEB_CONCURRENCY, WORKER_THREADS, WORKER_CONNECTIONS,
+PORT, WORKER_TIMEOUT and GRACEFUL_TIMEOUT. The same variables size the
+database pool of each worker (see config.production_engine_options).
+
+Reloading: SIGHUP re-reads this file and gracefully replaces the workers,
+letting in-flight requests finish within graceful_timeout. Because the
+application is preloaded in the master, new code is only picked up by a
+new master: send SIGUSR2 to start one next to the old master, then SIGQUIT
+to the old master once the new workers are up. SIGTERM shuts down
+gracefully.
+"""
+import gc
+import glob
+import os
+
+# Set in the environment once this master has cleared the metrics directory
+MULTIPROC_CLEARED = 'PROMETHEUS_MULTIPROC_CLEARED_BY'
+
+
+def clear_multiproc_dir():
+    """
+    Create the metrics directory and remove the files of a previous run.
+
+    This must happen before preload_app imports the application, whose
+    metrics open their files in the directory as soon as they are created.
+    SIGHUP re-reads this file in the same master; the marker keeps that from
+    removing the files of the running workers.
+    """
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not multiproc_dir or os.environ.get(MULTIPROC_CLEARED) == str(os.getpid()):
+        return
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+        os.remove(path)
+    os.environ[MULTIPROC_CLEARED] = str(os.getpid())
+
+
+clear_multiproc_dir()
+
+worker_class = os.environ.get('WORKER_CLASS', 'sync')
+
+if worker_class == 'gevent':
+    # Patch before the application is imported by preload_app below
+    from gevent import monkey
+    monkey.patch_all()
+
+    from app.green import patch_psycopg2
+    patch_psycopg2()
+
+from config import worker_count
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = worker_count()
+threads = int(os.environ.get('WORKER_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+timeout = int(os.environ.get('WORKER_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.environ.get('MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+preload_app = True
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Prepare a new worker process."""
+    # Objects inherited from the preloaded master are never freed; keeping
+    # them out of the collector stops it from writing to their pages, so
+    # they stay shared copy-on-write between the workers
+    gc.freeze()
+
+    # Connections opened by the master must not be shared with the workers
+    from app import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop the live metrics of an exited worker."""
+    from app.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,53 @@
+"""Add indexes matching the service query shapes
+
+Revision ID: 3c9e51b7a2d4
+Revises: 706142a007dc
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e51b7a2d4'
+down_revision = '706142a007dc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Build the indexes without locking the tables against writes on Postgres.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_id_status_due_date', 'tasks',
+                        ['user_id', 'status', 'due_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_user_id_due_date_id', 'tasks',
+                        ['user_id', 'due_date', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_user_id_due_date_pending', 'tasks',
+                        ['user_id', 'due_date'], unique=False,
+                        postgresql_where=sa.text("status = 'pending'"),
+                        sqlite_where=sa.text("status = 'pending'"),
+                        postgresql_concurrently=True)
+        op.create_index('ix_travel_diaries_user_id_start_date', 'travel_diaries',
+                        ['user_id', 'start_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_activities_diary_id_planned_date', 'activities',
+                        ['diary_id', 'planned_date'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_activities_diary_id_planned_date', table_name='activities',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_travel_diaries_user_id_start_date', table_name='travel_diaries',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_due_date_pending', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_due_date_id', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_status_due_date', table_name='tasks',
+                      postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""Add an index for the upcoming trips query
+
+Revision ID: 8f2d6c41b9e7
+Revises: 3c9e51b7a2d4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2d6c41b9e7'
+down_revision = '3c9e51b7a2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_travel_diaries_user_id_end_date', 'travel_diaries',
+                        ['user_id', 'end_date'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_travel_diaries_user_id_end_date', table_name='travel_diaries',
+                      postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""Store user emails trimmed and lowercase, unique on lower(email)
+
+Revision ID: b71e4a9d05c3
+Revises: 8f2d6c41b9e7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e4a9d05c3'
+down_revision = '8f2d6c41b9e7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    connection = op.get_bind()
+    # Normalized as normalize_email does: trim() is btrim() on PostgreSQL
+    duplicates = connection.execute(sa.text(
+        'SELECT lower(trim(email)) FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1 ORDER BY 1'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError('Several accounts share these emails ignoring case and spaces; merge or rename them '
+                           f'before upgrading: {", ".join(duplicates)}')
+
+    with op.get_context().autocommit_block():
+        # Each batch commits on its own, so rows are locked only briefly
+        while True:
+            result = connection.execute(sa.text(
+                'UPDATE users SET email = lower(trim(email)) WHERE id IN '
+                '(SELECT id FROM users WHERE email <> lower(trim(email)) ORDER BY id LIMIT :batch_size)'
+            ), {'batch_size': BATCH_SIZE})
+            if result.rowcount < BATCH_SIZE:
+                break
+
+        op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True)
+
+
+def downgrade():
+    # Emails stay lowercase
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email', 'users', ['email'], unique=True,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
@@ -1,20 +1,13 @@
-"""Initialize database migrations."""
-from flask_migrate import init, migrate, upgrade
-from app import create_app, db
+"""Apply the committed database migrations (same as `flask migrate-db`)."""
+from app import create_app
+from app.schema import migrate_database
 
 def init_migrations():
-    """Initialize and run initial migration."""
+    """Upgrade the database to the latest revision."""
     app = create_app()
     
     with app.app_context():
-        # Initialize migrations
-        init()
-        
-        # Create initial migration
-        migrate()
-        
-        # Apply migration
-        upgrade()
+        migrate_database()
 
 if __name__ == '__main__':
-    init_migrations() 
\ No newline at end of file
+    init_migrations()
@@ -1,6 +1,10 @@
 """Pytest configuration file."""
+from contextlib import contextmanager
 import pytest
+from flask import has_app_context
+from sqlalchemy import event
 from app import create_app, db
+from app.instrumentation import find_call_site, format_statements
 from app.models import User
 from config import TestingConfig
 
@@ -10,6 +14,17 @@ def app():
     app = create_app(TestingConfig)
     return app
 
+@pytest.fixture
+def make_app():
+    """Create applications with configuration settings overridden.
+    
+    Usage: ``make_app(RATELIMIT_ENABLED=False)``; the settings are added to
+    TestingConfig.
+    """
+    def factory(**settings):
+        return create_app(type('OverriddenConfig', (TestingConfig,), settings))
+    return factory
+
 @pytest.fixture
 def client(app):
     """Create test client."""
@@ -40,4 +55,40 @@ def test_user(init_database, app):
         )
         db.session.add(user)
         db.session.commit()
-        return user 
\ No newline at end of file
+        return user
+
+@pytest.fixture
+def query_budget(app):
+    """Fail the test when a block issues more SQL statements than allowed.
+    
+    Usage: ``with query_budget(3): client.get('/travel')``. The block gets
+    the list of (statement, duration, call site) sent so far, to check the
+    exact statements. They are counted on the engine of the active
+    application context, so apps from make_app can be checked too, or else
+    on the app fixture's. The failure lists the statements grouped by the
+    application line that issued them.
+    """
+    @contextmanager
+    def budget(max_queries):
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, 0.0, find_call_site()))
+        
+        if has_app_context():
+            engine = db.engine
+        else:
+            with app.app_context():
+                engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        if len(statements) > max_queries:
+            pytest.fail(
+                f'{len(statements)} queries, budget is {max_queries}\n{format_statements(statements)}',
+                pytrace=False
+            )
+    
+    return budget
@@ -49,4 +49,11 @@ def test_auth_flow(client, init_database):
     
     # Try to access protected route after logout
     response = client.get('/profile')
-    assert response.status_code == 302  # Redirect to login 
\ No newline at end of file
+    assert response.status_code == 302  # Redirect to login 
+def test_register_without_email(client, init_database):
+    """Test a registration without an email is rejected instead of failing."""
+    response = client.post('/auth/register', data={'username': 'no_email', 'password': 'password123'},
+                           follow_redirects=True)
+    assert response.status_code == 200
+    assert 'Invalid email format' in response.get_data(as_text=True)
+    assert User.query.filter_by(username='no_email').first() is None
@@ -59,4 +59,125 @@ def test_task_flow(client, test_user, init_database):
     # Delete the task
     response = client.delete(f'/tasks/{task.id}')
     assert response.status_code == 200
-    assert 'Tarea eliminada exitosamente' in response.get_data(as_text=True) 
\ No newline at end of file
+    assert 'Tarea eliminada exitosamente' in response.get_data(as_text=True) 
+def test_task_list_pagination(client, test_user, init_database):
+    """Test the task list is served in pages linked by a cursor."""
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    user = User.query.filter_by(email='test@example.com').first()
+    for i in range(25):
+        db.session.add(Task(title=f'Paged Task {i:02d}', category='personal',
+                            due_date=datetime(2030, 1, 1) + timedelta(days=i), user=user))
+    db.session.commit()
+    
+    # First page is rendered with the full layout and a cursor for the next one
+    response = client.get('/tasks')
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert 'Paged Task 19' in html
+    assert 'Paged Task 20' not in html
+    cursor = html.split('data-next-cursor="')[1].split('"')[0]
+    
+    # Next page is returned as a fragment
+    response = client.get(f'/tasks?cursor={cursor}')
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert 'Paged Task 20' in html
+    assert 'Paged Task 24' in html
+    assert '<html' not in html
+    assert 'X-Next-Cursor' not in response.headers
+    
+    # Malformed cursors are rejected
+    response = client.get('/tasks?cursor=bogus')
+    assert response.status_code == 400
+
+def test_bulk_task_flow(client, test_user, init_database):
+    """Test creating, completing and deleting tasks through the bulk endpoint."""
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    # Create several tasks in one request
+    response = client.post('/tasks/bulk', json={
+        'action': 'create',
+        'tasks': [
+            {'title': f'Bulk Task {i}', 'category': 'work', 'due_date': '2030-01-01'}
+            for i in range(5)
+        ]
+    })
+    assert response.status_code == 201
+    ids = response.get_json()['ids']
+    assert len(ids) == 5
+    
+    # Complete some of them
+    response = client.post('/tasks/bulk', json={'action': 'complete', 'ids': ids[:3]})
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 3
+    assert Task.query.filter_by(status='completed').count() == 3
+    
+    # Delete all of them
+    response = client.post('/tasks/bulk', json={'action': 'delete', 'ids': ids})
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 5
+    assert Task.query.count() == 0
+    
+    # Invalid payloads are rejected
+    response = client.post('/tasks/bulk', json={'action': 'delete', 'ids': 'all'})
+    assert response.status_code == 400
+    response = client.post('/tasks/bulk', json={'action': 'archive', 'ids': []})
+    assert response.status_code == 400
+
+def test_foreign_task_is_not_found(client, test_user, init_database):
+    """Test a user cannot read, complete or delete another user's task."""
+    other_user = User(username='other_user', email='other@example.com', password='password123')
+    task = Task(title='Private Task', category='personal', user=other_user)
+    db.session.add_all([other_user, task])
+    db.session.commit()
+    
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    assert client.get(f'/tasks/{task.id}').status_code == 404
+    assert client.post(f'/tasks/{task.id}/complete').status_code == 404
+    assert client.delete(f'/tasks/{task.id}').status_code == 404
+    assert Task.query.get(task.id).status == 'pending'
+
+def test_task_conditional_get(client, test_user, init_database, query_budget):
+    """Test an unchanged task is answered with 304 from its timestamp alone."""
+    db.session.add(test_user)
+    task = Task(title='Polled Task', category='personal', user=test_user)
+    db.session.add(task)
+    db.session.commit()
+    task_id = task.id
+    
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    response = client.get(f'/tasks/{task_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+    assert 'no-cache' in response.headers['Cache-Control']
+    
+    with query_budget(2) as statements:
+        response = client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert not any('tasks.title' in statement for statement, _, _ in statements)
+    
+    response = client.get(f'/tasks/{task_id}', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+    
+    client.post(f'/tasks/{task_id}/complete')
+    response = client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['status'] == 'completed'
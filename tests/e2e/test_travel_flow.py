@@ -55,6 +55,16 @@ def test_travel_flow(client, test_user, init_database):
     activity = Activity.query.filter_by(title='Test Activity').first()
     assert activity is not None
     
+    # Edit the activity
+    response = client.post(f'/travel/activity/{activity.id}', data=dict(
+        activity_data, title='Edited Activity', planned_time='18:30'
+    ), follow_redirects=True)
+    assert response.status_code == 200
+    assert 'Actividad actualizada exitosamente' in response.get_data(as_text=True)
+    db.session.refresh(activity)
+    assert activity.title == 'Edited Activity'
+    assert activity.planned_date.hour == 18
+    
     # Complete the activity
     completion_data = {
         'completion_notes': 'Activity completed successfully'
@@ -71,4 +81,66 @@ def test_travel_flow(client, test_user, init_database):
     # Delete the travel diary
     response = client.delete(f'/travel/{travel.id}')
     assert response.status_code == 200
-    assert 'Viaje eliminado exitosamente' in response.get_data(as_text=True) 
\ No newline at end of file
+    assert 'Viaje eliminado exitosamente' in response.get_data(as_text=True) 
+def test_travel_pages_query_budget(client, test_user, init_database, query_budget):
+    """Test the travel pages issue a constant number of queries."""
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    user = User.query.filter_by(email='test@example.com').first()
+    start_date = datetime.now() + timedelta(days=1)
+    for i in range(20):
+        diary = TravelDiary(title=f'Trip {i}', location='Somewhere', start_date=start_date,
+                            end_date=start_date + timedelta(days=5), user=user)
+        db.session.add(diary)
+        for j in range(4):
+            db.session.add(Activity(title=f'Activity {j}', diary=diary,
+                                    planned_date=start_date + timedelta(days=j)))
+    db.session.commit()
+    
+    with query_budget(4):
+        assert client.get('/').status_code == 200
+    with query_budget(3):
+        assert client.get('/travel').status_code == 200
+    with query_budget(4):
+        assert client.get(f'/travel/{diary.id}').status_code == 200
+
+def test_travel_json_conditional_get(client, test_user, init_database):
+    """Test the diary and activity JSON endpoints answer conditional requests."""
+    db.session.add(test_user)
+    diary = TravelDiary(title='Polled Trip', location='Somewhere',
+                        start_date=datetime.now() + timedelta(days=1), user=test_user)
+    activity = Activity(title='Polled Activity', diary=diary,
+                        planned_date=datetime.now() + timedelta(days=2))
+    db.session.add_all([diary, activity])
+    db.session.commit()
+    diary_id, activity_id = diary.id, activity.id
+    
+    client.post('/auth/login', data={
+        'email': 'test@example.com',
+        'password': 'password123'
+    }, follow_redirects=True)
+    
+    # Browsers get the page, scripts asking for JSON get the diary
+    assert 'Polled Trip' in client.get(f'/travel/{diary_id}').get_data(as_text=True)
+    response = client.get(f'/travel/{diary_id}', headers={'Accept': 'application/json'})
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Polled Trip'
+    response = client.get(f'/travel/{diary_id}', headers={
+        'Accept': 'application/json', 'If-None-Match': response.headers['ETag']
+    })
+    assert response.status_code == 304
+    
+    response = client.get(f'/travel/activity/{activity_id}')
+    assert response.status_code == 200
+    assert response.get_json()['completed'] is False
+    etag = response.headers['ETag']
+    assert client.get(f'/travel/activity/{activity_id}',
+                      headers={'If-None-Match': etag}).status_code == 304
+    
+    client.post(f'/travel/activity/{activity_id}/complete', data={'completion_notes': 'Done'})
+    response = client.get(f'/travel/activity/{activity_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['completed'] is True
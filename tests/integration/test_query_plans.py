@@ -0,0 +1,124 @@
+"""Integration tests for the indexes backing the service queries."""
+import re
+import pytest
+from datetime import datetime, timezone, timedelta
+from flask_migrate import upgrade
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Task, TravelDiary, Activity
+from app.services.task_service import TaskService, encode_task_cursor
+from app.services.travel_service import TravelService
+from app.services.user_service import UserService
+from config import TestingConfig
+
+INDEXED_TABLES = ('users', 'tasks', 'travel_diaries', 'activities')
+
+@pytest.fixture
+def seeded_database(init_database, app):
+    """Seed several users with tasks, diaries and activities."""
+    base_date = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    users = [User(username=f'plan_user_{i}', email=f'plan_user_{i}@example.com') for i in range(20)]
+    db.session.add_all(users)
+    for user in users:
+        for j in range(50):
+            db.session.add(Task(title=f'Task {j}', category='personal',
+                                status='pending' if j % 2 else 'completed',
+                                due_date=base_date + timedelta(days=j), user=user))
+        for k in range(5):
+            diary = TravelDiary(title=f'Trip {k}', location='Somewhere',
+                                start_date=base_date + timedelta(days=k * 10),
+                                end_date=base_date + timedelta(days=k * 10 + 5), user=user)
+            db.session.add(diary)
+            for a in range(5):
+                db.session.add(Activity(title=f'Activity {a}', diary=diary,
+                                        planned_date=base_date + timedelta(days=k * 10 + a)))
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return users[3]
+
+def capture_statements(func):
+    """Run func and return the (statement, parameters) it sent to the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+def sequential_scans(statement, parameters):
+    """Return the plan lines showing a full scan of one of the indexed tables."""
+    tables = '|'.join(INDEXED_TABLES)
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            plan = [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            pattern = re.compile(rf'^SCAN ({tables})\b')
+        else:
+            plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+            pattern = re.compile(rf'Seq Scan on ({tables})\b')
+    return [line for line in plan if pattern.search(line)]
+
+@pytest.mark.parametrize('query', [
+    lambda user, diary: TaskService().get_user_tasks(user, status='pending', limit=5),
+    lambda user, diary: TaskService().get_user_tasks(user, status='completed', category='personal'),
+    lambda user, diary: TaskService().get_user_tasks_page(user),
+    lambda user, diary: TaskService().get_user_tasks_page(user, status='pending'),
+    lambda user, diary: TravelService().get_user_diaries(user, loading='selectin'),
+    lambda user, diary: TravelService().get_user_diaries(user, loading='counts'),
+    lambda user, diary: TravelService().get_upcoming_diaries(user, datetime(2030, 1, 22, tzinfo=timezone.utc)),
+    lambda user, diary: TravelService().get_diary_activities(diary),
+    lambda user, diary: TravelService().get_diary_summary(diary),
+    lambda user, diary: UserService().get_user_by_email('Plan_User_3@Example.com'),
+], ids=['pending_tasks', 'filtered_tasks', 'tasks_page', 'pending_tasks_page',
+        'diaries_selectin', 'diaries_counts', 'upcoming_diaries', 'diary_activities', 'diary_summary',
+        'user_by_email'])
+def test_service_queries_use_indexes(seeded_database, query):
+    """Test the service queries never fall back to a sequential scan."""
+    user = seeded_database
+    diary = TravelDiary.query.filter_by(user_id=user.id).first()
+
+    statements = capture_statements(lambda: query(user, diary))
+    assert statements
+    for statement, parameters in statements:
+        scans = sequential_scans(statement, parameters)
+        assert not scans, f'Sequential scan {scans} in:\n{statement}'
+
+def test_deep_task_page_starts_at_cursor(seeded_database):
+    """Test a deep page seeks to its cursor in the index instead of reading the rows before it."""
+    user = seeded_database
+    task = Task.query.filter_by(user_id=user.id).order_by(Task.due_date, Task.id).offset(40).first()
+    cursor = encode_task_cursor(task)
+
+    statements = capture_statements(lambda: TaskService().get_user_tasks_page(user, limit=5, cursor=cursor))
+    assert len(statements) == 1
+    statement, parameters = statements[0]
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            plan = [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            bound = re.compile(r'USING INDEX ix_tasks_user_id_due_date_id \(user_id=\? AND due_date>\?\)')
+        else:
+            plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+            bound = re.compile(r'Index Cond: .*ROW\(due_date, id\) >')
+    assert any(bound.search(line) for line in plan), plan
+    assert not any('TEMP B-TREE' in line or 'Sort' in line for line in plan), plan
+
+def test_migrations_create_query_indexes(tmp_path):
+    """Test the migrations create the same query indexes as the models."""
+    class MigrationConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "migrations.db"}'
+
+    app = create_app(MigrationConfig)
+    with app.app_context():
+        upgrade()
+        for table in INDEXED_TABLES:
+            # Read from sqlite_master, since reflection skips expression indexes
+            migrated = set(db.session.execute(
+                db.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {'table': table}
+            ).scalars())
+            expected = {index.name for index in db.metadata.tables[table].indexes}
+            assert expected <= migrated
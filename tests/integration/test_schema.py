@@ -0,0 +1,121 @@
+"""Integration tests for the schema migrations and startup check."""
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+from app import create_app, db
+from app.schema import (BASELINE_REVISION, SchemaOutOfDate, check_schema, migrate_database,
+                        script_heads)
+from config import TestingConfig
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Create an application backed by an empty SQLite file."""
+    class SchemaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "schema.db"}'
+
+    return create_app(SchemaConfig)
+
+def current_revisions():
+    """Return the revisions recorded in the database."""
+    rows = db.session.execute(text('SELECT version_num FROM alembic_version'))
+    return {row[0] for row in rows}
+
+def test_check_schema_empty_database(file_app):
+    """Test an unmigrated database is rejected."""
+    with file_app.app_context():
+        with pytest.raises(SchemaOutOfDate) as exc_info:
+            check_schema()
+    assert 'no revision' in str(exc_info.value)
+
+def test_migrate_database(file_app):
+    """Test migrating brings the database to the head revision."""
+    with file_app.app_context():
+        migrate_database()
+        check_schema()
+        assert current_revisions() == script_heads()
+
+def test_migrate_database_is_idempotent(file_app):
+    """Test running the migration again does nothing."""
+    with file_app.app_context():
+        migrate_database()
+        migrate_database()
+        check_schema()
+
+def test_check_schema_outdated_database(file_app):
+    """Test a database behind the head revision is rejected."""
+    with file_app.app_context():
+        upgrade(revision=BASELINE_REVISION)
+        with pytest.raises(SchemaOutOfDate) as exc_info:
+            check_schema()
+    assert BASELINE_REVISION in str(exc_info.value)
+
+def test_migrate_legacy_database(file_app):
+    """Test a database stamped with an autogenerated revision is adopted."""
+    with file_app.app_context():
+        upgrade(revision=BASELINE_REVISION)
+        db.session.execute(text("UPDATE alembic_version SET version_num = 'a1b2c3d4e5f6'"))
+        db.session.commit()
+
+        migrate_database()
+        check_schema()
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('tasks')}
+        assert 'ix_tasks_user_id_status_due_date' in indexes
+
+def test_migrate_unversioned_database(file_app):
+    """Test tables without a recorded revision are not migrated blindly."""
+    with file_app.app_context():
+        db.create_all()
+        with pytest.raises(SchemaOutOfDate):
+            migrate_database()
+
+def test_commands(file_app):
+    """Test the migrate-db and check-schema commands."""
+    runner = file_app.test_cli_runner()
+    result = runner.invoke(args=['check-schema'])
+    assert result.exit_code != 0
+    assert 'flask migrate-db' in result.output
+
+    result = runner.invoke(args=['migrate-db'])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(args=['check-schema'])
+    assert result.exit_code == 0
+
+def insert_user(username, email):
+    """Insert a user row directly, bypassing the model's normalization."""
+    db.session.execute(text(
+        "INSERT INTO users (username, email, active) VALUES (:username, :email, 1)"
+    ), {'username': username, 'email': email})
+    db.session.commit()
+
+def test_email_migration_lowercases_existing_rows(file_app):
+    """Test the email backfill normalizes existing rows and leaves a case-insensitive unique index."""
+    with file_app.app_context():
+        upgrade(revision='8f2d6c41b9e7')
+        for i in range(5):
+            insert_user(f'user{i}', f'User{i}@Example.COM')
+        insert_user('lower', 'lower@example.com')
+        insert_user('padded', ' Padded@Example.com ')
+        upgrade()
+
+        emails = db.session.execute(text('SELECT email FROM users ORDER BY id')).scalars().all()
+        assert emails == ([f'user{i}@example.com' for i in range(5)]
+                          + ['lower@example.com', 'padded@example.com'])
+        with pytest.raises(Exception):
+            insert_user('dup', 'LOWER@example.com')
+        db.session.rollback()
+        indexes = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE tbl_name = 'users'")).scalars())
+        assert 'ix_users_email_lower' in indexes
+        assert 'ix_users_email' not in indexes
+
+def test_email_migration_refuses_case_duplicates(file_app):
+    """Test accounts differing only in email case are reported instead of merged."""
+    with file_app.app_context():
+        upgrade(revision='8f2d6c41b9e7')
+        insert_user('first', 'Same@example.com')
+        insert_user('second', ' same@example.com')
+        # Flask-Migrate logs the migration's error and exits
+        with pytest.raises(SystemExit):
+            upgrade()
+        assert db.session.execute(text('SELECT email FROM users ORDER BY id')).scalars().all() == [
+            'Same@example.com', ' same@example.com'
+        ]
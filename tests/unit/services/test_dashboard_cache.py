@@ -0,0 +1,121 @@
+"""Unit tests for the dashboard cache."""
+import threading
+import time
+from datetime import datetime, timezone
+import pytest
+from app.models import User
+from app.routes.views import build_dashboard
+from app.services.dashboard_cache import dashboard_cache
+from app.services.task_service import TaskService
+from app.services.travel_service import TravelService
+from app import db
+
+@pytest.fixture
+def user(test_user):
+    """Return the test user attached to the session."""
+    db.session.add(test_user)
+    return test_user
+
+@pytest.fixture
+def counting_build():
+    """Wrap build_dashboard and count its calls."""
+    calls = []
+
+    def build(user):
+        calls.append(user.id)
+        return build_dashboard(user)
+
+    build.calls = calls
+    return build
+
+class TestDashboardCache:
+    """Test cases for the dashboard cache."""
+
+    def test_hit_does_not_rebuild(self, user, counting_build):
+        """Test the dashboard is built once and then read from the cache."""
+        TaskService().create_task(user, title='Pending', category='work',
+                                  due_date=datetime(2030, 1, 1, tzinfo=timezone.utc))
+        first = dashboard_cache.get_dashboard(user, counting_build)
+        second = dashboard_cache.get_dashboard(user, counting_build)
+        assert counting_build.calls == [user.id]
+        assert first == second
+        assert second['pending_tasks'][0]['title'] == 'Pending'
+        assert second['pending_tasks'][0]['due_date'].date() == datetime(2030, 1, 1).date()
+
+    def test_task_writes_invalidate(self, user, counting_build):
+        """Test creating and completing tasks refreshes the dashboard."""
+        task_service = TaskService()
+        assert dashboard_cache.get_dashboard(user, counting_build)['pending_tasks'] == []
+
+        task = task_service.create_task(user, title='New', category='work')
+        assert [task['title'] for task in
+                dashboard_cache.get_dashboard(user, counting_build)['pending_tasks']] == ['New']
+
+        task_service.mark_task_completed(task)
+        assert dashboard_cache.get_dashboard(user, counting_build)['pending_tasks'] == []
+        assert len(counting_build.calls) == 3
+
+    def test_travel_writes_invalidate(self, user, counting_build):
+        """Test diary and activity writes refresh the dashboard."""
+        travel_service = TravelService()
+        diary = travel_service.create_travel_diary(
+            user, title='Trip', location='Lima',
+            start_date=datetime(2030, 1, 1, tzinfo=timezone.utc),
+            end_date=datetime(2030, 1, 5, tzinfo=timezone.utc)
+        )
+        travels = dashboard_cache.get_dashboard(user, counting_build)['upcoming_travels']
+        assert [(travel['title'], travel['activity_count']) for travel in travels] == [('Trip', 0)]
+
+        activity = travel_service.add_activity(diary, title='Museum',
+                                               planned_date=datetime(2030, 1, 2, tzinfo=timezone.utc))
+        travels = dashboard_cache.get_dashboard(user, counting_build)['upcoming_travels']
+        assert travels[0]['activity_count'] == 1
+
+        travel_service.delete_activity(activity)
+        travels = dashboard_cache.get_dashboard(user, counting_build)['upcoming_travels']
+        assert travels[0]['activity_count'] == 0
+
+        travel_service.delete_diary(diary)
+        assert dashboard_cache.get_dashboard(user, counting_build)['upcoming_travels'] == []
+
+    def test_invalidation_during_build_is_not_lost(self, user):
+        """Test a dashboard built before a concurrent write is not served afterwards."""
+        def build_then_write(user):
+            dashboard = build_dashboard(user)
+            dashboard_cache.invalidate(user.id)
+            return dashboard
+
+        dashboard_cache.get_dashboard(user, build_then_write)
+        calls = []
+        dashboard_cache.get_dashboard(user, lambda user: calls.append(1) or build_dashboard(user))
+        assert calls == [1]
+
+    def test_concurrent_misses_build_once(self, app, user):
+        """Test concurrent requests for a missing dashboard share one build."""
+        user_id = user.id
+        calls = []
+        results = []
+
+        def slow_build(user):
+            calls.append(1)
+            time.sleep(0.1)
+            return {'pending_tasks': [], 'upcoming_travels': []}
+
+        def request_dashboard():
+            with app.app_context():
+                results.append(dashboard_cache.get_dashboard(db.session.get(User, user_id), slow_build))
+
+        threads = [threading.Thread(target=request_dashboard) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert len(results) == 4
+
+    def test_cache_disabled(self, app, user, counting_build):
+        """Test the cache can be turned off."""
+        app.config['DASHBOARD_CACHE_ENABLED'] = False
+        dashboard_cache.get_dashboard(user, counting_build)
+        dashboard_cache.get_dashboard(user, counting_build)
+        assert len(counting_build.calls) == 2
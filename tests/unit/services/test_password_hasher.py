@@ -0,0 +1,79 @@
+"""Unit tests for the password hashing service."""
+import pytest
+from flask import current_app
+from werkzeug.security import check_password_hash
+from app.services import password_hasher as password_hasher_module
+from app.services.password_hasher import (PasswordHashingBusy, gevent_threadpool, normalize_method,
+                                          password_hasher)
+
+class TestPasswordHasher:
+    """Test cases for PasswordHasher."""
+
+    def test_normalize_method(self):
+        """Test methods are compared with werkzeug's defaults filled in."""
+        assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+        assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+        assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+
+    def test_needs_rehash(self, make_app):
+        """Test only hashes made with other parameters need a rehash."""
+        with make_app(PASSWORD_HASH_METHOD='scrypt').app_context():
+            assert not password_hasher.needs_rehash(password_hasher.hash('secret'))
+            assert password_hasher.needs_rehash('pbkdf2:sha256:1000$salt$hash')
+            assert password_hasher.needs_rehash('scrypt:16384:8:1$salt$hash')
+
+    def test_hashing_in_process_pool(self, make_app):
+        """Test passwords are hashed and verified by the process pool."""
+        app = make_app(PASSWORD_HASH_POOL_SIZE=1, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+        with app.app_context():
+            password_hash = password_hasher.hash('secret')
+            assert password_hash.startswith('pbkdf2:sha256:1000$')
+            assert password_hasher.verify(password_hash, 'secret')
+            assert not password_hasher.verify(password_hash, 'wrong')
+            state = current_app.extensions['password_hasher']
+            assert state['pool'] is not None
+            state['pool'].shutdown()
+
+    def test_no_gevent_threadpool_without_gevent(self):
+        """Test the process pool is used when gevent has not patched the process."""
+        assert gevent_threadpool() is None
+
+    def test_hashing_in_gevent_threadpool(self, make_app, monkeypatch):
+        """Test a gevent worker hashes in the hub's thread pool instead of the process pool."""
+        calls = []
+
+        class ThreadPool:
+            def apply(self, function, args):
+                calls.append(function)
+                return function(*args)
+
+        monkeypatch.setattr(password_hasher_module, 'gevent_threadpool', ThreadPool)
+        app = make_app(PASSWORD_HASH_POOL_SIZE=1, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+        with app.app_context():
+            password_hash = password_hasher.hash('secret')
+            assert password_hasher.verify(password_hash, 'secret')
+            assert len(calls) == 2
+            assert current_app.extensions['password_hasher']['pool'] is None
+
+    def test_concurrency_cap(self, make_app):
+        """Test a request fails fast when every hashing slot is taken."""
+        app = make_app(PASSWORD_HASH_POOL_SIZE=1, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_TIMEOUT=0.01)
+        with app.app_context():
+            slots = current_app.extensions['password_hasher']['slots']
+            slots.acquire()
+            try:
+                with pytest.raises(PasswordHashingBusy):
+                    password_hasher.hash('secret')
+            finally:
+                slots.release()
+
+    def test_weak_method_refused_outside_testing(self, make_app):
+        """Test the cheap test method cannot be used by a real deployment."""
+        with pytest.raises(RuntimeError, match='too weak'):
+            make_app(TESTING=False, PASSWORD_HASH_METHOD='pbkdf2:sha256:1')
+        make_app(TESTING=False, PASSWORD_HASH_METHOD='scrypt:32768:8:1')
+
+        with make_app().app_context():
+            password_hash = password_hasher.hash('secret')
+        assert password_hash.startswith('pbkdf2:sha256:1$')
+        assert check_password_hash(password_hash, 'secret')
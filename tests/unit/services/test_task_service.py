@@ -1,6 +1,6 @@
 """Unit tests for TaskService."""
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from app.models import User, Task
 from app.services.task_service import TaskService
 from app import db
@@ -172,4 +172,145 @@ class TestTaskService:
         task_service.delete_task(task)
         
         with pytest.raises(ValueError):
-            task_service.get_task_by_id(task.id) 
\ No newline at end of file
+            task_service.get_task_by_id(task.id)
+
+    def test_get_user_tasks_page_walks_all_tasks(self, init_database, task_service, test_user):
+        """Test keyset pagination returns every task once in (due_date, id) order."""
+        base_date = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        for i in range(7):
+            task_service.create_task(test_user, title=f'Task {i}', category='personal',
+                                     due_date=base_date + timedelta(days=i % 3))
+        task_service.create_task(test_user, title='Undated 1', category='personal')
+        task_service.create_task(test_user, title='Undated 2', category='personal')
+
+        titles = []
+        cursor = None
+        pages = 0
+        while True:
+            tasks, cursor = task_service.get_user_tasks_page(test_user, limit=2, cursor=cursor)
+            titles.extend(task.title for task in tasks)
+            pages += 1
+            if not cursor:
+                break
+
+        assert pages == 5
+        assert titles == ['Task 0', 'Task 3', 'Task 6', 'Task 1', 'Task 4',
+                          'Task 2', 'Task 5', 'Undated 1', 'Undated 2']
+
+    def test_get_user_tasks_page_with_filters(self, init_database, task_service, test_user):
+        """Test keyset pagination keeps the status and category filters."""
+        for i in range(3):
+            task_service.create_task(test_user, title=f'Work {i}', category='work')
+        task_service.create_task(test_user, title='Personal', category='personal')
+        task_service.create_task(test_user, title='Work done', category='work', status='completed')
+
+        tasks, cursor = task_service.get_user_tasks_page(test_user, status='pending', category='work', limit=2)
+        assert [task.title for task in tasks] == ['Work 0', 'Work 1']
+        tasks, cursor = task_service.get_user_tasks_page(test_user, status='pending', category='work',
+                                                         limit=2, cursor=cursor)
+        assert [task.title for task in tasks] == ['Work 2']
+        assert cursor is None
+
+    def test_get_user_tasks_page_invalid_cursor(self, init_database, task_service, test_user):
+        """Test keyset pagination with a malformed cursor."""
+        with pytest.raises(ValueError) as exc_info:
+            task_service.get_user_tasks_page(test_user, cursor='not-a-cursor')
+        assert str(exc_info.value) == "Invalid cursor"
+
+    def test_bulk_create_tasks(self, init_database, task_service, test_user):
+        """Test creating many tasks at once."""
+        db.session.add(test_user)
+        tasks = task_service.bulk_create_tasks(test_user, [
+            {'title': 'Bulk 1', 'category': 'work'},
+            {'title': 'Bulk 2', 'category': 'personal', 'status': 'completed',
+             'due_date': datetime(2030, 1, 1)},
+        ])
+
+        assert [task.title for task in tasks] == ['Bulk 1', 'Bulk 2']
+        assert all(task.id and task.user_id == test_user.id for task in tasks)
+        assert tasks[0].status == 'pending'
+        assert tasks[0].description == ''
+        assert tasks[1].completed_at is not None
+        assert Task.query.filter_by(user_id=test_user.id).count() == 2
+
+    def test_bulk_create_tasks_is_atomic(self, init_database, task_service, test_user):
+        """Test an invalid task prevents the whole batch from being created."""
+        db.session.add(test_user)
+        with pytest.raises(ValueError) as exc_info:
+            task_service.bulk_create_tasks(test_user, [
+                {'title': 'Valid', 'category': 'work'},
+                {'title': 'Invalid', 'category': 'invalid_category'},
+            ])
+        assert str(exc_info.value) == "Invalid category"
+        assert Task.query.count() == 0
+
+    def test_bulk_create_tasks_rejects_status_unknown_to_model(self, init_database, task_service, test_user):
+        """Test bulk creation refuses statuses that create_task would refuse."""
+        db.session.add(test_user)
+        with pytest.raises(ValueError) as exc_info:
+            task_service.bulk_create_tasks(test_user, [
+                {'title': 'In progress', 'category': 'work', 'status': 'in_progress'},
+            ])
+        assert str(exc_info.value) == "Invalid status"
+        assert Task.query.count() == 0
+
+    def test_bulk_update_status_is_owner_scoped(self, init_database, task_service, test_user):
+        """Test bulk status updates only touch the user's own tasks."""
+        other_user = User(username='other_user', email='other@example.com', password='password123')
+        db.session.add_all([test_user, other_user])
+        own_tasks = task_service.bulk_create_tasks(test_user, [
+            {'title': f'Own {i}', 'category': 'work'} for i in range(3)
+        ])
+        other_task = task_service.create_task(other_user, title='Other', category='work')
+
+        count = task_service.bulk_update_status(
+            test_user, [task.id for task in own_tasks] + [other_task.id], 'completed'
+        )
+
+        assert count == 3
+        db.session.expire_all()
+        assert all(task.status == 'completed' and task.completed_at for task in own_tasks)
+        assert other_task.status == 'pending'
+
+    def test_bulk_update_status_invalid_status(self, init_database, task_service, test_user):
+        """Test bulk status update with an invalid status."""
+        with pytest.raises(ValueError) as exc_info:
+            task_service.bulk_update_status(test_user, [1], 'invalid_status')
+        assert str(exc_info.value) == "Invalid status"
+        with pytest.raises(ValueError):
+            task_service.bulk_update_status(test_user, [1], 'in_progress')
+
+    def test_bulk_delete_is_owner_scoped(self, init_database, task_service, test_user):
+        """Test bulk deletion only removes the user's own tasks."""
+        other_user = User(username='other_user', email='other@example.com', password='password123')
+        db.session.add_all([test_user, other_user])
+        own_tasks = task_service.bulk_create_tasks(test_user, [
+            {'title': f'Own {i}', 'category': 'work'} for i in range(3)
+        ])
+        other_task = task_service.create_task(other_user, title='Other', category='work')
+
+        count = task_service.bulk_delete(test_user, [task.id for task in own_tasks] + [other_task.id])
+
+        assert count == 3
+        assert Task.query.count() == 1
+        assert task_service.get_task_by_id(other_task.id) == other_task
+
+    def test_bulk_operations_size_limit(self, init_database, task_service, test_user):
+        """Test bulk operations reject oversized batches."""
+        with pytest.raises(ValueError):
+            task_service.bulk_delete(test_user, range(task_service.MAX_BULK_SIZE + 1))
+
+    def test_get_owned_task(self, init_database, task_service, test_user, sample_task_data):
+        """Test getting a task scoped to its owner."""
+        other_user = User(username='other_user', email='other@example.com', password='password123')
+        db.session.add(other_user)
+        task = task_service.create_task(test_user, **sample_task_data)
+        
+        assert task_service.get_owned_task(test_user.id, task.id) == task
+        
+        with pytest.raises(ValueError) as exc_info:
+            task_service.get_owned_task(other_user.id, task.id)
+        assert str(exc_info.value) == "Task not found"
+        
+        with pytest.raises(ValueError):
+            task_service.get_owned_task(test_user.id, 999)
@@ -155,6 +155,23 @@ class TestTravelService:
         assert completed_activity.is_completed
         assert isinstance(completed_activity.completed_at, datetime)
 
+    def test_update_activity(self, init_database, travel_service, test_user, sample_diary_data, sample_activity_data):
+        """Test updating an activity, keeping its date within the diary's."""
+        diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
+        activity = travel_service.add_activity(diary, **sample_activity_data)
+        
+        updated = travel_service.update_activity(activity, {'title': 'Park Güell', 'cost': 10.0})
+        assert updated.title == 'Park Güell'
+        assert updated.cost == 10.0
+        assert updated.location == sample_activity_data['location']
+        
+        with pytest.raises(ValueError) as exc_info:
+            travel_service.update_activity(activity, {
+                'title': 'Too late', 'planned_date': sample_diary_data['end_date'] + timedelta(days=1)
+            })
+        assert str(exc_info.value) == "Activity date must be within diary date range"
+        assert activity.title == 'Park Güell'
+
     def test_update_diary_success(self, init_database, travel_service, test_user, sample_diary_data):
         """Test successful travel diary update."""
         diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
@@ -197,4 +214,117 @@ class TestTravelService:
         travel_service.delete_diary(diary)
         
         with pytest.raises(ValueError):
-            travel_service.get_diary_by_id(diary.id) 
\ No newline at end of file
+            travel_service.get_diary_by_id(diary.id) 
+
+    def test_get_diary_summary(self, init_database, travel_service, test_user, sample_diary_data):
+        """Test aggregated activity figures for a travel diary."""
+        diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
+        start_date = sample_diary_data['start_date']
+        first = travel_service.add_activity(diary, title='Museum', planned_date=start_date + timedelta(days=1), cost=20.0)
+        travel_service.add_activity(diary, title='Dinner', planned_date=start_date + timedelta(days=1), cost=35.5)
+        travel_service.add_activity(diary, title='Beach', planned_date=start_date + timedelta(days=2))
+        travel_service.mark_activity_completed(first)
+
+        summary = travel_service.get_diary_summary(diary)
+        assert summary['total_activities'] == 3
+        assert summary['completed_activities'] == 1
+        assert summary['total_cost'] == 55.5
+        assert summary['remaining_cost'] == 35.5
+        assert summary['cost_per_day'] == [
+            ((start_date + timedelta(days=1)).date(), 55.5),
+            ((start_date + timedelta(days=2)).date(), 0.0)
+        ]
+
+    def test_get_diary_summary_empty(self, init_database, travel_service, test_user, sample_diary_data):
+        """Test summary of a travel diary without activities."""
+        diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
+
+        summary = travel_service.get_diary_summary(diary)
+        assert summary['total_activities'] == 0
+        assert summary['completed_activities'] == 0
+        assert summary['total_cost'] == 0.0
+        assert summary['cost_per_day'] == []
+
+    @pytest.mark.parametrize('loading', ['lazy', 'selectin', 'joined', 'counts'])
+    def test_get_user_diaries_loading_strategies(self, init_database, travel_service, test_user, sample_diary_data, loading):
+        """Test every loading strategy returns the same diaries and activity counts."""
+        diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
+        travel_service.add_activity(diary, title='Activity 1', planned_date=sample_diary_data['start_date'] + timedelta(days=1))
+        travel_service.add_activity(diary, title='Activity 2', planned_date=sample_diary_data['start_date'] + timedelta(days=2))
+        travel_service.create_travel_diary(test_user, title='Empty Trip', location='Nowhere',
+                                           start_date=sample_diary_data['start_date'] + timedelta(days=10))
+        db.session.expire_all()
+
+        diaries = travel_service.get_user_diaries(test_user, loading=loading)
+        assert [d.title for d in diaries] == [sample_diary_data['title'], 'Empty Trip']
+        assert [d.activity_count for d in diaries] == [2, 0]
+
+    def test_get_user_diaries_invalid_loading(self, init_database, travel_service, test_user):
+        """Test getting diaries with an unknown loading strategy."""
+        with pytest.raises(ValueError) as exc_info:
+            travel_service.get_user_diaries(test_user, loading='eager')
+        assert str(exc_info.value).startswith("Invalid loading strategy")
+
+    @pytest.mark.parametrize('loading', ['selectin', 'joined', 'counts'])
+    def test_get_user_diaries_constant_queries(self, init_database, travel_service, test_user, sample_diary_data, loading, query_budget):
+        """Test eager strategies do not issue one query per diary."""
+        for i in range(5):
+            diary = travel_service.create_travel_diary(test_user, title=f'Trip {i}', location='Somewhere',
+                                                       start_date=sample_diary_data['start_date'])
+            travel_service.add_activity(diary, title='Activity', planned_date=sample_diary_data['start_date'])
+        db.session.expire_all()
+        db.session.refresh(test_user)
+
+        with query_budget(2):
+            diaries = travel_service.get_user_diaries(test_user, loading=loading)
+            for diary in diaries:
+                diary.activity_count
+                if loading != 'counts':
+                    diary.activities[:3]
+
+    def test_get_owned_diary_and_activity(self, init_database, travel_service, test_user, sample_diary_data, sample_activity_data, query_budget):
+        """Test getting diaries and activities scoped to their owner in one query."""
+        other_user = User(username='other_user', email='other@example.com', password='password123')
+        db.session.add(other_user)
+        diary = travel_service.create_travel_diary(test_user, **sample_diary_data)
+        activity = travel_service.add_activity(diary, **sample_activity_data)
+        user_id, other_user_id = test_user.id, other_user.id
+        diary_id, activity_id = diary.id, activity.id
+        db.session.expire_all()
+
+        with query_budget(2) as statements:
+            assert travel_service.get_owned_diary(user_id, diary_id).id == diary_id
+            assert travel_service.get_owned_activity(user_id, activity_id).id == activity_id
+        assert len(statements) == 2
+
+        with pytest.raises(ValueError, match="Travel diary not found"):
+            travel_service.get_owned_diary(other_user_id, diary_id)
+        with pytest.raises(ValueError, match="Activity not found"):
+            travel_service.get_owned_activity(other_user_id, activity_id)
+        with pytest.raises(ValueError, match="Activity not found"):
+            travel_service.get_owned_activity(user_id, 999)
+
+    def test_get_upcoming_diaries(self, init_database, travel_service, test_user, query_budget):
+        """Test only trips that have not ended are returned, by start date, with their counts."""
+        now = datetime(2030, 6, 15, 12, tzinfo=timezone.utc)
+        trips = {
+            'Past': (now - timedelta(days=30), now - timedelta(days=20)),
+            'Ongoing': (now - timedelta(days=2), now + timedelta(days=2)),
+            'Next month': (now + timedelta(days=30), now + timedelta(days=35)),
+            'Next week': (now + timedelta(days=7), None),
+        }
+        for title, (start_date, end_date) in trips.items():
+            diary = travel_service.create_travel_diary(test_user, title=title, location='Somewhere',
+                                                       start_date=start_date, end_date=end_date)
+            travel_service.add_activity(diary, title='Activity', planned_date=start_date)
+        db.session.expire_all()
+        db.session.refresh(test_user)
+
+        with query_budget(1):
+            diaries = travel_service.get_upcoming_diaries(test_user, now=now, limit=5)
+            counts = [diary.activity_count for diary in diaries]
+
+        assert [diary.title for diary in diaries] == ['Ongoing', 'Next week', 'Next month']
+        assert counts == [1, 1, 1]
+        assert [diary.title for diary in travel_service.get_upcoming_diaries(test_user, now=now, limit=2)] \
+            == ['Ongoing', 'Next week']
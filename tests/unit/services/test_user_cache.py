@@ -0,0 +1,92 @@
+"""Unit tests for the login user cache."""
+import pytest
+from sqlalchemy import event
+from app.models import User
+from app.services.user_cache import user_cache
+from app.services.user_service import UserService
+from app import db
+
+@pytest.fixture
+def user_id(init_database):
+    """Create a user and return its ID with an empty session."""
+    user = UserService().create_user(username='cached_user', email='cached@example.com', password='password123')
+    user_id = user.id
+    db.session.remove()
+    return user_id
+
+@pytest.fixture
+def statements(app):
+    """Collect the SQL statements sent while the test runs."""
+    collected = []
+    listener = lambda *args: collected.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield collected
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+class TestUserCache:
+    """Test cases for the user cache."""
+
+    def test_load_user_hits_cache(self, user_id, statements):
+        """Test a cached user is loaded without querying the database."""
+        assert user_cache.load_user(user_id).username == 'cached_user'
+        db.session.remove()
+        statements.clear()
+
+        user = user_cache.load_user(user_id)
+        assert statements == []
+        assert user.username == 'cached_user'
+        assert user.email == 'cached@example.com'
+        assert user.is_active
+        assert user in db.session
+        assert user.check_password('password123')
+
+    def test_load_user_not_found(self, init_database):
+        """Test loading a missing user."""
+        assert user_cache.load_user(999) is None
+
+    def test_load_user_cache_disabled(self, app, user_id, statements):
+        """Test the cache can be turned off."""
+        app.config['USER_CACHE_ENABLED'] = False
+        user_cache.load_user(user_id)
+        db.session.remove()
+        statements.clear()
+
+        user_cache.load_user(user_id)
+        assert len(statements) == 1
+
+    def test_update_user_invalidates(self, user_id):
+        """Test updating a user drops its cache entry."""
+        user = user_cache.load_user(user_id)
+        UserService().update_user(user, {'email': 'new@example.com'})
+        db.session.remove()
+
+        assert user_cache.load_user(user_id).email == 'new@example.com'
+
+    def test_deactivation_invalidates(self, user_id):
+        """Test clearing the active flag drops the cache entry."""
+        user = user_cache.load_user(user_id)
+        user.active = False
+        db.session.commit()
+        db.session.remove()
+
+        assert not user_cache.load_user(user_id).is_active
+
+    def test_delete_user_invalidates(self, user_id):
+        """Test deleting a user drops its cache entry."""
+        user = user_cache.load_user(user_id)
+        UserService().delete_user(user)
+        db.session.remove()
+
+        assert user_cache.load_user(user_id) is None
+
+    def test_rollback_keeps_entry(self, user_id, statements):
+        """Test a rolled back change does not invalidate the entry."""
+        user = user_cache.load_user(user_id)
+        user.active = False
+        db.session.flush()
+        db.session.rollback()
+        db.session.remove()
+        statements.clear()
+
+        assert user_cache.load_user(user_id).is_active
+        assert statements == []
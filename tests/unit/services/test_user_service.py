@@ -1,6 +1,7 @@
 """Unit tests for UserService."""
 import pytest
 from datetime import datetime, timezone
+from werkzeug.security import generate_password_hash
 from app.models import User
 from app.services.user_service import UserService
 from app import db
@@ -39,6 +40,7 @@ class TestUserService:
         with pytest.raises(ValueError) as exc_info:
             user_service.create_user(**sample_user_data)
         assert str(exc_info.value) == "Username already exists"
+        assert exc_info.value.column == 'username'
 
     def test_create_user_duplicate_email(self, init_database, user_service, sample_user_data):
         """Test user creation with duplicate email."""
@@ -50,6 +52,28 @@ class TestUserService:
         with pytest.raises(ValueError) as exc_info:
             user_service.create_user(**new_data)
         assert str(exc_info.value) == "Email already exists"
+        assert exc_info.value.column == 'email'
+
+    def test_create_user_duplicate_email_other_case(self, init_database, user_service, sample_user_data):
+        """Test emails differing only in case count as duplicates."""
+        user_service.create_user(**sample_user_data)
+
+        with pytest.raises(ValueError) as exc_info:
+            user_service.create_user('another_user', ' TEST@Example.com ', 'password')
+        assert str(exc_info.value) == "Email already exists"
+
+    def test_create_user_single_insert(self, init_database, user_service, sample_user_data, query_budget):
+        """Test registration is one INSERT, with no lookups before it."""
+        with query_budget(3) as statements:
+            user_service.create_user(**sample_user_data)
+            new_data = dict(sample_user_data, username='another_user')
+            with pytest.raises(ValueError):
+                user_service.create_user(**new_data)
+        assert [statement.split()[0] for statement, _, _ in statements] == ['INSERT', 'INSERT', 'SELECT']
+        
+        # The failed INSERT was rolled back, so the session is usable again
+        user = user_service.create_user(**dict(new_data, email='another@example.com'))
+        assert user.username == 'another_user'
 
     def test_create_user_invalid_email(self, init_database, user_service):
         """Test user creation with invalid email format."""
@@ -97,6 +121,14 @@ class TestUserService:
         retrieved_user = user_service.get_user_by_email(sample_user_data['email'])
         assert retrieved_user == created_user
 
+    def test_get_user_by_email_ignores_case(self, init_database, user_service, sample_user_data):
+        """Test emails are stored lowercased and looked up in any case."""
+        created_user = user_service.create_user('mixed_case', 'Mixed.Case@Example.COM', 'password')
+        assert created_user.email == 'mixed.case@example.com'
+
+        retrieved_user = user_service.get_user_by_email('MIXED.case@example.com')
+        assert retrieved_user.id == created_user.id
+
     def test_update_user_success(self, init_database, user_service, sample_user_data):
         """Test successful user update."""
         user = user_service.create_user(**sample_user_data)
@@ -141,4 +173,17 @@ class TestUserService:
         user_service.delete_user(user)
         
         with pytest.raises(ValueError):
-            user_service.get_user_by_id(user.id) 
\ No newline at end of file
+            user_service.get_user_by_id(user.id)
+
+    def test_verify_password_rehashes_old_hashes(self, init_database, user_service, sample_user_data):
+        """Test a hash made with other parameters is upgraded on a successful login."""
+        user = user_service.create_user(**sample_user_data)
+        user.password_hash = generate_password_hash(sample_user_data['password'], 'scrypt:16384:8:1')
+        db.session.commit()
+        
+        assert not user_service.verify_password(user, 'wrong_password')
+        assert user.password_hash.startswith('scrypt:16384:8:1$')
+        
+        assert user_service.verify_password(user, sample_user_data['password'])
+        assert user.password_hash.startswith('pbkdf2:sha256:1$')
+        assert user.check_password(sample_user_data['password'])
@@ -0,0 +1,74 @@
+"""Unit tests for the fingerprinted static assets."""
+import gzip
+import os
+import shutil
+import pytest
+from flask import url_for
+from app.assets import build_assets, fingerprinted_name
+
+@pytest.fixture
+def built_app(tmp_path, make_app):
+    """Create an application after building its assets into a throwaway directory."""
+    build_dir = f'dist-{tmp_path.name}'
+    static_folder = make_app().static_folder
+    output_dir = os.path.join(static_folder, build_dir)
+    build_assets(static_folder, output_dir)
+    try:
+        yield make_app(ASSETS_BUILD_DIR=build_dir)
+    finally:
+        shutil.rmtree(output_dir)
+
+def test_build_assets(tmp_path):
+    """Test files are hashed, stylesheet urls rewritten and text files precompressed."""
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'fonts').mkdir()
+    (static / 'fonts' / 'icons.woff2').write_bytes(b'font')
+    (static / 'css' / 'site.css').write_text(
+        'body{background:url("../fonts/icons.woff2?v=1")}' * 20 + '.logo{background:url(data:image/png;base64,AA==)}'
+    )
+    
+    manifest = build_assets(str(static), str(static / 'dist'))
+    font = manifest['fonts/icons.woff2']
+    assert font == fingerprinted_name('fonts/icons.woff2', b'font')
+    css = (static / 'dist' / manifest['css/site.css']).read_text()
+    assert f'url("../{font}?v=1")' in css
+    assert 'url(data:image/png;base64,AA==)' in css
+    assert gzip.decompress((static / 'dist' / (manifest['css/site.css'] + '.gz')).read_bytes()).decode() == css
+    assert not (static / 'dist' / (font + '.gz')).exists()
+    
+    # Rebuilding replaces the previous build instead of hashing it again
+    assert build_assets(str(static), str(static / 'dist')) == manifest
+
+def test_url_for_resolves_hashed_names(built_app):
+    """Test templates link the hashed copies of the vendored assets."""
+    with built_app.test_request_context():
+        url = url_for('static', filename='css/style.css')
+    assert url.startswith(f"/static/{built_app.config['ASSETS_BUILD_DIR']}/css/style.")
+    assert url != '/static/css/style.css'
+    
+    page = built_app.test_client().get('/auth/login').get_data(as_text=True)
+    assert 'cdn.jsdelivr.net' not in page
+    assert 'js/main.js' not in page
+    assert '/vendor/bootstrap/css/bootstrap.min.' in page
+
+def test_hashed_assets_served_immutable_and_precompressed(built_app):
+    """Test hashed files are cached for a year and sent precompressed when accepted."""
+    client = built_app.test_client()
+    with built_app.test_request_context():
+        url = url_for('static', filename='vendor/bootstrap/css/bootstrap.min.css')
+    
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/css'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert gzip.decompress(response.data) == plain.data
+    
+    # Unhashed paths keep working, without immutable caching
+    response = client.get('/static/css/style.css')
+    assert response.status_code == 200
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
@@ -0,0 +1,124 @@
+"""Unit tests for the benchmark suite."""
+from datetime import datetime, timezone
+import pytest
+from app import create_app, db
+from app.models import Activity, Task, TravelDiary, User
+from benchmarks.dataset import DatasetSpec, generate_dataset
+from benchmarks.load import (ClientSession, Sample, parse_mix, run_load, summarize_samples,
+                             virtual_users)
+from benchmarks.run import benchmark_config, compare, prepare_database, recheck_slower, run_benchmarks
+from benchmarks.stats import percentile, summarize
+
+ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SPEC = DatasetSpec(users=2, tasks_per_user=5, diaries_per_user=2, activities_per_diary=3, seed=7)
+
+def task_rows():
+    """Return the generated tasks as comparable tuples."""
+    return [(task.title, task.category, task.status, task.due_date, task.user_id)
+            for task in Task.query.order_by(Task.id)]
+
+def test_dataset_shape(init_database):
+    """Test the generator creates the requested number of rows."""
+    dataset = generate_dataset(SPEC, anchor=ANCHOR)
+    assert len(dataset.user_ids) == User.query.count() == 2
+    assert len(dataset.diary_ids) == TravelDiary.query.count() == 4
+    assert dataset.task_count == Task.query.count() == 10
+    assert dataset.activity_count == Activity.query.count() == 12
+
+def test_dataset_is_deterministic():
+    """Test the same seed and anchor produce the same rows."""
+    generated = []
+    for _ in range(2):
+        app = create_app(benchmark_config('sqlite:///:memory:'))
+        with app.app_context():
+            db.create_all()
+            generate_dataset(SPEC, anchor=ANCHOR)
+            generated.append(task_rows())
+    assert generated[0] == generated[1]
+
+def test_percentiles():
+    """Test percentiles use the nearest rank."""
+    samples = [i / 1000 for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.05
+    assert percentile(samples, 99) == 0.099
+    assert summarize(samples)['p95_ms'] == 95.0
+
+def test_compare_reports_regressions():
+    """Test slower medians and extra queries are reported."""
+    baseline = {'results': {
+        'fast': {'p50_ms': 10.0, 'queries': 2},
+        'noisy': {'p50_ms': 0.1, 'queries': 1},
+        'queries': {'p50_ms': 5.0, 'queries': 1}
+    }}
+    report = {'results': {
+        'fast': {'p50_ms': 14.0, 'queries': 2},
+        'noisy': {'p50_ms': 0.3, 'queries': 1},
+        'queries': {'p50_ms': 5.0, 'queries': 3},
+        'new': {'p50_ms': 1.0, 'queries': 1}
+    }}
+    regressions = compare(report, baseline, threshold=0.25, min_delta_ms=0.5)
+    assert regressions == ['fast: median 10.00 -> 14.00 ms (+40%)', 'queries: 1 -> 3 queries']
+
+def test_recheck_keeps_faster_run():
+    """Test a case found slower is timed again and only kept slow if the rerun is slow too."""
+    app = create_app(benchmark_config('sqlite:///:memory:'))
+    dataset = prepare_database(app, SPEC)
+    report = run_benchmarks(app, dataset, repeat=2, warmup=0, only='view.travel')
+    baseline = {'results': {name: dict(result) for name, result in report['results'].items()}}
+    report['results']['view.travel']['p50_ms'] += 1000
+    recheck_slower(app, dataset, report, baseline, threshold=0.25, min_delta_ms=0.5, repeat=2, warmup=0)
+    assert report['results']['view.travel']['p50_ms'] < 1000
+
+def test_run_benchmarks():
+    """Test the view benchmarks run against a generated dataset."""
+    app = create_app(benchmark_config('sqlite:///:memory:'))
+    dataset = prepare_database(app, SPEC)
+    report = run_benchmarks(app, dataset, repeat=2, warmup=0, only='view.travel')
+    assert set(report['results']) == {'view.travel', 'view.travel_detail'}
+    assert report['meta']['dataset']['seed'] == 7
+    assert report['results']['view.travel']['runs'] == 2
+    assert report['results']['view.travel']['queries'] > 0
+
+def test_parse_mix():
+    """Test workload weights are parsed and unknown routes rejected."""
+    assert parse_mix('dashboard=3,login=1') == {'dashboard': 3, 'login': 1}
+    with pytest.raises(ValueError):
+        parse_mix('checkout=1')
+
+def test_summarize_samples():
+    """Test throughput and error rates are reported per route."""
+    samples = [Sample('dashboard', 0.01, True), Sample('dashboard', 0.03, False),
+               Sample('login', 0.2, True)]
+    report = summarize_samples(samples, elapsed=2.0)
+    assert report['total']['requests'] == 3
+    assert report['routes']['dashboard']['error_rate'] == 0.5
+    assert report['routes']['dashboard']['throughput_rps'] == 1.0
+    assert report['routes']['login']['p99_ms'] == 200.0
+
+def test_run_load_through_client(tmp_path):
+    """Test a short mixed workload runs without errors."""
+    app = create_app(benchmark_config(f'sqlite:///{tmp_path / "load.db"}'))
+    dataset = prepare_database(app, SPEC)
+    mix = {'dashboard': 1, 'task_create': 1, 'task_complete': 1, 'diary_detail': 1}
+    report = run_load(lambda: ClientSession(app), virtual_users(app, dataset), mix,
+                      concurrency=2, duration=0.5)
+    assert report['total']['requests'] > 0
+    assert report['total']['errors'] == 0
+    assert set(report['routes']) <= set(mix)
+
+def test_run_load_stops_when_a_login_fails(tmp_path):
+    """Test a failed first login ends the run with an error instead of hanging."""
+    app = create_app(benchmark_config(f'sqlite:///{tmp_path / "load.db"}'))
+    dataset = prepare_database(app, SPEC)
+    users = virtual_users(app, dataset)
+    sessions = []
+
+    def session_factory():
+        sessions.append(None)
+        if len(sessions) == 2:
+            raise ConnectionError('refused')
+        return ClientSession(app)
+
+    report = run_load(session_factory, users, {'dashboard': 1}, concurrency=2, duration=0.5)
+    assert report['routes']['login']['errors'] == 1
+    assert 'dashboard' not in report['routes']
@@ -0,0 +1,48 @@
+"""Unit tests for the cache backends."""
+import time
+import pytest
+from app.cache import MemoryCache, create_cache
+
+def test_memory_cache_get_set_delete():
+    """Test storing, reading and deleting entries."""
+    cache = MemoryCache()
+    cache.set('key', {'value': 1})
+    assert cache.get('key') == {'value': 1}
+    cache.delete('key')
+    assert cache.get('key') is None
+
+def test_memory_cache_add():
+    """Test add only stores a value when the key is free or expired."""
+    cache = MemoryCache()
+    assert cache.add('key', 'first', ttl=0.01)
+    assert not cache.add('key', 'second')
+    assert cache.get('key') == 'first'
+    time.sleep(0.02)
+    assert cache.add('key', 'third')
+    assert cache.get('key') == 'third'
+
+def test_memory_cache_expires_entries():
+    """Test entries are dropped after their time-to-live."""
+    cache = MemoryCache(ttl=0.01)
+    cache.set('key', 'value')
+    cache.set('long', 'value', ttl=60)
+    time.sleep(0.02)
+    assert cache.get('key') is None
+    assert cache.get('long') == 'value'
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test the oldest unused entry is evicted when the cache is full."""
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+def test_create_cache_invalid_backend(app):
+    """Test an unknown backend is rejected."""
+    app.config['CACHE_BACKEND'] = 'memcached'
+    with pytest.raises(ValueError):
+        create_cache(app, prefix='test:', maxsize=10, ttl=10)
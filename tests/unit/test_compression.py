@@ -0,0 +1,93 @@
+"""Unit tests for the response compression."""
+import gzip
+import zlib
+import pytest
+from flask import Response, jsonify, stream_with_context
+from app import db
+from app.compression import GzipEncoder, _stream
+from app.models import Task
+
+@pytest.fixture
+def make_app(make_app):
+    """Add test routes to the applications created by make_app."""
+    def factory(**settings):
+        app = make_app(**settings)
+        items = [{'id': i, 'title': f'Task {i}'} for i in range(200)]
+        app.add_url_rule('/large', 'large', lambda: jsonify(items))
+        app.add_url_rule('/small', 'small', lambda: jsonify({'id': 1}))
+        app.add_url_rule('/image', 'image', lambda: Response(b'\x89PNG' * 500, mimetype='image/png'))
+        app.add_url_rule('/stream', 'stream', lambda: Response(
+            stream_with_context(f'<p>row {i}</p>' for i in range(1000)), mimetype='text/html'
+        ))
+        return app
+    return factory
+
+def test_large_json_gzipped(make_app):
+    """Test a large JSON body is gzipped for clients that accept it."""
+    client = make_app().test_client()
+    plain = client.get('/large')
+    assert 'Content-Encoding' not in plain.headers
+    
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) < len(plain.data)
+    assert gzip.decompress(response.data) == plain.data
+
+def test_compression_skipped(make_app):
+    """Test small bodies, binary types, refused encodings and disabled configs are left alone."""
+    client = make_app().test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/image', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/large', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+    
+    client = make_app(COMPRESS_ENABLED=False).test_client()
+    assert 'Content-Encoding' not in client.get('/large', headers={'Accept-Encoding': 'gzip'}).headers
+
+def test_min_size_and_level_configurable(make_app):
+    """Test the threshold and the level come from the configuration."""
+    client = make_app(COMPRESS_MIN_SIZE=1, COMPRESS_LEVEL=1).test_client()
+    assert client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers['Content-Encoding'] == 'gzip'
+
+def test_streamed_response_compressed(make_app):
+    """Test a streamed body is compressed without a Content-Length."""
+    client = make_app().test_client()
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.data).decode() == ''.join(f'<p>row {i}</p>' for i in range(1000))
+
+def test_stream_flushes_each_chunk():
+    """Test every chunk is decodable as soon as it is sent."""
+    chunks = _stream(iter([b'<html>', b'<body>']), GzipEncoder(6), flush=True)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(next(chunks)) == b'<html>'
+
+def test_static_file_compressed_as_sent(client):
+    """Test a file sent by the static view is compressed without loading it first."""
+    path = '/static/vendor/bootstrap/css/bootstrap.min.css'
+    plain = client.get(path)
+    response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert 'Accept-Ranges' not in response.headers
+    assert gzip.decompress(response.data) == plain.data
+    plain.close()
+    response.close()
+
+def test_etag_weakened_when_compressed(client, test_user, init_database):
+    """Test conditional requests still match the ETag of a compressed response."""
+    db.session.add(test_user)
+    task = Task(title='Compressed Task', description='x' * 1000, category='personal', user=test_user)
+    db.session.add(task)
+    db.session.commit()
+    task_id = task.id
+    client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password123'})
+    
+    response = client.get(f'/tasks/{task_id}', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+    response = client.get(f'/tasks/{task_id}', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']
+    })
+    assert response.status_code == 304
@@ -0,0 +1,81 @@
+"""Unit tests for the production configuration."""
+from sqlalchemy.pool import NullPool
+from config import (production_engine_options, shared_dashboard_cache, statement_timeout_ms,
+                    worker_concurrency, worker_count)
+
+def test_worker_concurrency():
+    """Test concurrency follows the worker model."""
+    assert worker_concurrency({}) == 1
+    assert worker_concurrency({'WORKER_CLASS': 'gthread', 'WORKER_THREADS': '8'}) == 8
+    assert worker_concurrency({'WORKER_CLASS': 'gevent', 'WORKER_CONNECTIONS': '200'}) == 200
+
+def test_worker_count():
+    """Test the number of worker processes follows the CPUs and worker model."""
+    assert worker_count({}, cpu_count=4) == 9
+    assert worker_count({'WORKER_CLASS': 'gthread'}, cpu_count=4) == 9
+    assert worker_count({'WORKER_CLASS': 'gevent'}, cpu_count=4) == 4
+    assert worker_count({'WEB_CONCURRENCY': '3'}, cpu_count=4) == 3
+
+def test_engine_options_sync_workers():
+    """Test a sync worker keeps a single pooled connection."""
+    options = production_engine_options({})
+    assert options['pool_size'] == 1
+    assert options['max_overflow'] == 0
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 1800
+    assert options['connect_args']['options'] == '-c statement_timeout=30000'
+
+def test_engine_options_threaded_workers():
+    """Test the pool matches the threads of a worker."""
+    options = production_engine_options({'WORKER_CLASS': 'gthread', 'WORKER_THREADS': '4'})
+    assert options['pool_size'] == 4
+    assert options['max_overflow'] == 0
+
+def test_engine_options_gevent_workers():
+    """Test the pool of gevent workers is capped."""
+    options = production_engine_options({'WORKER_CLASS': 'gevent'})
+    assert options['pool_size'] == 10
+    assert options['max_overflow'] == 10
+
+def test_engine_options_overrides():
+    """Test every setting can be overridden from the environment."""
+    options = production_engine_options({
+        'DB_POOL_SIZE': '5',
+        'DB_MAX_OVERFLOW': '2',
+        'DB_POOL_RECYCLE': '300',
+        'DB_POOL_PRE_PING': 'false',
+        'DB_STATEMENT_TIMEOUT_MS': '0'
+    })
+    assert options['pool_size'] == 5
+    assert options['max_overflow'] == 2
+    assert options['pool_recycle'] == 300
+    assert options['pool_pre_ping'] is False
+    assert 'options' not in options['connect_args']
+
+def test_engine_options_empty_variables():
+    """Test empty variables, as copied from .env.example, keep the defaults."""
+    options = production_engine_options({
+        'WORKER_CLASS': 'gevent',
+        'WORKER_CONNECTIONS': '',
+        'DB_POOL_SIZE': '',
+        'DB_MAX_OVERFLOW': '',
+        'DB_POOL_PRE_PING': ''
+    })
+    assert options['pool_size'] == 10
+    assert options['max_overflow'] == 10
+    assert options['pool_pre_ping'] is True
+    assert statement_timeout_ms({'DB_STATEMENT_TIMEOUT_MS': ''}) == 30000
+    assert statement_timeout_ms({'DB_STATEMENT_TIMEOUT_MS': '0'}) == 0
+
+def test_engine_options_transaction_proxy():
+    """Test the proxy mode leaves pooling and startup options to the proxy."""
+    options = production_engine_options({'DB_POOL_MODE': 'transaction_proxy'})
+    assert options['poolclass'] is NullPool
+    assert 'pool_size' not in options
+    assert 'options' not in options['connect_args']
+
+def test_dashboard_cache_needs_shared_backend():
+    """Test the per-process dashboard cache is only used with a single worker."""
+    assert shared_dashboard_cache({'WORKER_CLASS': 'gevent', 'WEB_CONCURRENCY': '4'}) is False
+    assert shared_dashboard_cache({'WEB_CONCURRENCY': '1'}) is True
+    assert shared_dashboard_cache({'CACHE_BACKEND': 'redis', 'WEB_CONCURRENCY': '4'}) is True
@@ -0,0 +1,83 @@
+"""Unit tests for the SQL query instrumentation."""
+import logging
+import pytest
+from app import db
+from app.instrumentation import QueryBudgetExceeded, current_query_stats, query_budget
+from app.services.task_service import TaskService
+
+def test_server_timing_header(client, init_database):
+    """Test responses report the number of queries and their duration."""
+    response = client.get('/auth/login')
+    assert response.status_code == 200
+    assert 'db;dur=' in response.headers['Server-Timing']
+    assert 'desc="0 queries"' in response.headers['Server-Timing']
+
+def test_request_counts_queries(app, init_database):
+    """Test statements run during a request are counted and timed."""
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        db.session.execute(db.text('SELECT 1'))
+        db.session.execute(db.text('SELECT 2'))
+        stats = current_query_stats()
+        assert stats.count == 2
+        assert stats.duration > 0
+        assert [statement for statement, _, _ in stats.statements] == ['SELECT 1', 'SELECT 2']
+
+def test_record_queries_with_call_site(make_app):
+    """Test statements and their call sites are kept when recording is enabled."""
+    app = make_app(SQL_RECORD_QUERIES=True)
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        db.create_all()
+        with pytest.raises(ValueError):
+            TaskService().get_owned_task(1, 1)
+        statement, duration, call_site = current_query_stats().statements[-1]
+        assert statement.startswith('SELECT')
+        assert call_site.startswith('app/services/task_service.py:')
+        assert call_site.endswith('in get_owned_task')
+
+def test_slow_query_logged(make_app, caplog):
+    """Test statements over the threshold are logged with their SQL."""
+    app = make_app(SQL_SLOW_QUERY_MS=0)
+    with app.app_context(), caplog.at_level(logging.WARNING, logger='app.sql'):
+        db.session.execute(db.text('SELECT 42'))
+    assert any('SELECT 42' in record.getMessage() for record in caplog.records)
+
+def test_instrumentation_disabled(make_app):
+    """Test the instrumentation can be turned off."""
+    app = make_app(SQL_INSTRUMENTATION_ENABLED=False)
+    response = app.test_client().get('/auth/login')
+    assert 'Server-Timing' not in response.headers
+
+def test_query_budget_exceeded(make_app):
+    """Test a view over its budget fails with the statements grouped by call site."""
+    app = make_app()
+
+    @app.route('/chatty')
+    @query_budget(1)
+    def chatty():
+        for _ in range(3):
+            db.session.execute(db.text('SELECT 1'))
+        return 'ok'
+
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded) as exc_info:
+            app.test_client().get('/chatty')
+    message = str(exc_info.value)
+    assert 'chatty issued 3 queries, budget is 1' in message
+    assert '3 x tests/' not in message
+    assert 'SELECT 1' in message
+
+def test_query_budget_logged(make_app, caplog):
+    """Test a view over its budget is only logged outside the tests."""
+    app = make_app(SQL_QUERY_BUDGET='log')
+
+    @app.route('/chatty')
+    @query_budget(0)
+    def chatty():
+        db.session.execute(db.text('SELECT 1'))
+        return 'ok'
+
+    with caplog.at_level(logging.WARNING, logger='app.sql'):
+        assert app.test_client().get('/chatty').status_code == 200
+    assert any('budget is 0' in record.getMessage() for record in caplog.records)
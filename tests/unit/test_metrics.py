@@ -0,0 +1,139 @@
+"""Unit tests for the Prometheus metrics."""
+from datetime import datetime, timezone
+import os
+import subprocess
+import sys
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from app import db
+from app.metrics import Metrics
+from app.services.task_service import TaskService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def sample(name, **labels):
+    """Return the current value of a sample, treating a missing one as 0."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_metrics_endpoint(client, init_database):
+    """Test request latencies are exposed in the text exposition format."""
+    client.get('/auth/login')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'app_request_duration_seconds_bucket{' in body
+    assert 'endpoint="auth.login"' in body
+    assert 'app_requests_in_progress' in body
+
+def test_request_latency_observed(client, init_database):
+    """Test each request is observed under its endpoint and status."""
+    labels = {'method': 'GET', 'endpoint': 'auth.login', 'status': '200'}
+    before = sample('app_request_duration_seconds_count', **labels)
+    client.get('/auth/login')
+    assert sample('app_request_duration_seconds_count', **labels) == before + 1
+    assert sample('app_requests_in_progress', endpoint='auth.login') == 0
+
+def test_metrics_restricted_to_allowed_networks(client, init_database):
+    """Test the endpoint is hidden from clients outside the allowed networks."""
+    response = client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 404
+
+def test_metrics_token(make_app):
+    """Test a configured token is required regardless of the client address."""
+    client = make_app(METRICS_TOKEN='secret').test_client()
+    assert client.get('/metrics').status_code == 404
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'},
+                          environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 200
+
+def test_metrics_disabled(make_app):
+    """Test the metrics can be turned off."""
+    client = make_app(METRICS_ENABLED=False).test_client()
+    assert client.get('/metrics').status_code == 404
+
+def test_login_counter(client, test_user):
+    """Test successful and failed logins are counted."""
+    success = sample('app_logins_total', result='success')
+    failure = sample('app_logins_total', result='failure')
+    client.post('/auth/login', data={'email': 'test@example.com', 'password': 'wrong'})
+    client.post('/auth/login', data={'email': 'test@example.com', 'password': 'password123'})
+    assert sample('app_logins_total', result='failure') == failure + 1
+    assert sample('app_logins_total', result='success') == success + 1
+
+def test_task_writes_counted_on_commit(init_database, test_user):
+    """Test unit of work and bulk task writes are counted once committed."""
+    db.session.add(test_user)
+    task_service = TaskService()
+    created = sample('app_writes_total', model='task', operation='create')
+    updated = sample('app_writes_total', model='task', operation='update')
+    deleted = sample('app_writes_total', model='task', operation='delete')
+
+    task = task_service.create_task(test_user, title='One', category='personal')
+    task_service.bulk_create_tasks(test_user, [
+        {'title': 'Two', 'category': 'work'},
+        {'title': 'Three', 'category': 'work'}
+    ])
+    task_service.mark_task_completed(task)
+    task_service.bulk_delete(test_user, [task.id])
+
+    assert sample('app_writes_total', model='task', operation='create') == created + 3
+    assert sample('app_writes_total', model='task', operation='update') == updated + 1
+    assert sample('app_writes_total', model='task', operation='delete') == deleted + 1
+
+def test_rolled_back_writes_not_counted(init_database, test_user):
+    """Test writes of a rolled back transaction are discarded."""
+    from app.models import Task
+    db.session.add(test_user)
+    created = sample('app_writes_total', model='task', operation='create')
+    db.session.add(Task(title='Draft', category='personal', user=test_user,
+                        due_date=datetime.now(timezone.utc)))
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    assert sample('app_writes_total', model='task', operation='create') == created
+
+def test_pool_gauges(tmp_path):
+    """Test the pool gauges follow connections checked out of a QueuePool."""
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=QueuePool,
+                           pool_size=1, max_overflow=1)
+    Metrics._watch_pool(engine)
+    first = engine.connect()
+    second = engine.connect()
+    assert sample('app_db_pool_checked_out') == 2
+    assert sample('app_db_pool_overflow') == 1
+    second.close()
+    first.close()
+    assert sample('app_db_pool_checked_out') == 0
+    assert sample('app_db_pool_overflow') == 0
+    engine.dispose()
+
+def run_python(code, multiproc_dir):
+    """Run code in a fresh interpreter with metrics in multiprocess mode."""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(multiproc_dir), WORKER_CLASS='sync')
+    env.pop('PROMETHEUS_MULTIPROC_CLEARED_BY', None)
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+
+def test_import_creates_multiproc_dir(tmp_path):
+    """Test the app imports with a missing multiprocess directory (e.g. `flask migrate-db`)."""
+    multiproc_dir = tmp_path / 'missing' / 'prometheus'
+    result = run_python('from app import create_app; from config import TestingConfig; '
+                        'create_app(TestingConfig)', multiproc_dir)
+    assert result.returncode == 0, result.stderr
+    assert multiproc_dir.is_dir()
+
+def test_gunicorn_config_clears_multiproc_dir(tmp_path):
+    """Test the gunicorn config removes stale files before the app is preloaded."""
+    (tmp_path / 'gauge_livesum_1.db').write_bytes(b'stale')
+    result = run_python(
+        'import runpy, os; runpy.run_path("gunicorn.conf.py"); import app.metrics; '
+        'print(sorted(os.listdir(os.environ["PROMETHEUS_MULTIPROC_DIR"])))',
+        tmp_path
+    )
+    assert result.returncode == 0, result.stderr
+    files = eval(result.stdout)
+    assert 'gauge_livesum_1.db' not in files
+    assert any(name.startswith('gauge_livesum_') for name in files)
@@ -0,0 +1,69 @@
+"""Unit tests for the login rate limiting."""
+import pytest
+from app import db
+from app.rate_limit import MemoryBucketStore, parse_limit
+
+LIMITS = {'auth.login': {'ip': '3/minute', 'email': '2/minute'}}
+
+def login(client, email, address='198.51.100.1'):
+    """Attempt a login from address."""
+    return client.post('/auth/login', data={'email': email, 'password': 'wrong'},
+                       environ_base={'REMOTE_ADDR': address})
+
+def test_parse_limit():
+    """Test limits are read as a capacity and a refill rate."""
+    assert parse_limit('5/minute') == (5, 5 / 60)
+    assert parse_limit('10 / hour') == (10, 10 / 3600)
+    with pytest.raises(ValueError):
+        parse_limit('5 per minute')
+
+def test_memory_bucket_refills():
+    """Test a bucket allows a burst, then one request per refilled token."""
+    store = MemoryBucketStore()
+    assert [store.consume('key', 2, 1.0, now=100.0) for _ in range(3)] == [0.0, 0.0, 1.0]
+    assert store.consume('key', 2, 1.0, now=100.5) == 0.5
+    assert store.consume('key', 2, 1.0, now=101.0) == 0.0
+    assert store.consume('other', 2, 1.0, now=101.0) == 0.0
+
+def test_memory_bucket_store_is_bounded():
+    """Test the least recently used buckets are dropped beyond maxsize."""
+    store = MemoryBucketStore(maxsize=2)
+    for key in ('a', 'b', 'c'):
+        store.consume(key, 1, 1.0, now=0.0)
+    assert list(store._buckets) == ['b', 'c']
+
+def test_login_limited_per_email(make_app):
+    """Test one account cannot be tried from many addresses."""
+    client = make_app(RATELIMIT_LIMITS=LIMITS).test_client()
+    with client.application.app_context():
+        db.create_all()
+    assert login(client, 'victim@example.com', '198.51.100.1').status_code == 302
+    assert login(client, 'Victim@example.com', '198.51.100.2').status_code == 302
+    response = login(client, 'victim@example.com', '198.51.100.3')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert login(client, 'other@example.com', '198.51.100.3').status_code == 302
+
+def test_login_limited_per_address_before_any_query(make_app, query_budget):
+    """Test a rejected attempt issues no query, and forms are still shown."""
+    app = make_app(RATELIMIT_LIMITS=LIMITS)
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        for i in range(3):
+            assert login(client, f'user{i}@example.com').status_code == 302
+        with query_budget(0):
+            assert login(client, 'user3@example.com').status_code == 429
+    assert client.get('/auth/login', environ_base={'REMOTE_ADDR': '198.51.100.1'}).status_code == 200
+
+def test_rate_limit_disabled(make_app):
+    """Test no attempt is rejected when rate limiting is disabled."""
+    client = make_app(RATELIMIT_LIMITS=LIMITS, RATELIMIT_ENABLED=False).test_client()
+    with client.application.app_context():
+        db.create_all()
+    assert all(login(client, 'victim@example.com').status_code == 302 for _ in range(4))
+
+def test_create_bucket_store_rejects_unknown_backend(make_app):
+    """Test an unknown backend is reported at startup."""
+    with pytest.raises(ValueError):
+        make_app(RATELIMIT_BACKEND='memcached')
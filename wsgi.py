@@ -0,0 +1,10 @@
+"""WSGI entrypoint for production servers (gunicorn wsgi:app)."""
+from app import create_app
+from app.schema import check_schema
+from config import ProductionConfig
+
+app = create_app(ProductionConfig)
+
+if app.config['SCHEMA_CHECK_ON_START']:
+    with app.app_context():
+        check_schema()